@@ -5,20 +5,37 @@ class ConnectionPassManagerPort(ABC):
     """
     The port for issuing temporary connection passes to authenticated users.
 
-    This abstraction hides the underlying mechanism that generates and stores
+    This abstraction hides the underlying mechanism that generates, stores and verifies
     temporary connection identifiers used by the transport layer.
     """
 
     @abstractmethod
-    async def issue_pass(self) -> str:
+    async def issue_pass(self, user_id: int) -> str:
         """
-        Generate a connection pass.
+        Generate a connection pass for a user.
 
         The pass must be:
             - unique across all active sessions;
             - short-lived (expires automatically after a configured TTL).
 
+        Args:
+            user_id (int): The id of the user that the pass is issued for.
+
         Returns:
             str: The unique identifier (token) representing the issued pass.
         """
         ...
+
+    @abstractmethod
+    async def redeem_pass(self, connection_pass: str) -> int | None:
+        """
+        Verify a connection pass and consume it so that it can not be used again.
+
+        Args:
+            connection_pass (str): A previously issued connection pass.
+
+        Returns:
+            int | None: The id of the user the pass was issued for or None if the pass
+            is invalid, expired or was already used.
+        """
+        ...
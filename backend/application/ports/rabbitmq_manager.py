@@ -1,4 +1,7 @@
 from abc import ABC, abstractmethod
+from asyncio import Future
+
+from domain.entities import Message
 
 
 class RabbitMQManagerPort(ABC):
@@ -7,11 +10,17 @@ class RabbitMQManagerPort(ABC):
     """
 
     @abstractmethod
-    async def send_message(self, message_data: dict) -> None:
+    async def send_message(self, message: Message) -> Future:
         """
         This method is responsible for sending the messages to the RabbitMQ.
 
+        The method does not wait for the broker to accept the message.
+
         Args:
-            message_data (dict): The serializable representation of a Message entity.
+            message (Message): The message entity.
+
+        Returns:
+            Future: The future that is resolved once the broker has accepted the message
+                or set to the exception should the sending fail.
         """
         ...
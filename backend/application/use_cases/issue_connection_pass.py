@@ -1,4 +1,4 @@
-from application.ports import ConnectionPassManagerPort, RedisManagerPort
+from application.ports import ConnectionPassManagerPort
 
 
 class IssueConnectionPassUseCase:
@@ -10,7 +10,6 @@ class IssueConnectionPassUseCase:
         self,
         user_id,
         connection_pass_manager: ConnectionPassManagerPort,
-        redis_manager: RedisManagerPort,
     ) -> None:
         """"
         Initialize class.
@@ -18,20 +17,15 @@ class IssueConnectionPassUseCase:
         Args:
             user_id (int): The id of the user that requested a connection pass.
             connection_pass_manager (ConnectionPassManager): The port for the connection pass manager.
-            redis_manager (RedisManager): The port for the redis manager class.
         """
         self.user_id = user_id
         self.connection_pass_manager = connection_pass_manager
-        self.redis_manager = redis_manager
 
     async def execute(self) -> str:
         """
-        Issue a single usage connection pass and add it to the redis.
+        Issue a single usage connection pass.
 
         Returns:
             connection_pass (str): A connection pass.
         """
-        connection_pass = await self.connection_pass_manager.issue_pass()
-        await self.redis_manager.add_connection_pass(connection_pass=connection_pass, user_id=self.user_id)
-
-        return connection_pass
+        return await self.connection_pass_manager.issue_pass(user_id=self.user_id)
@@ -1,3 +1,5 @@
+from asyncio import Future
+
 from application.ports import RabbitMQManagerPort
 from domain.entities import Message
 
@@ -23,12 +25,13 @@ class SendMessageUseCase:
         self.message_data = message_data
         self.rabbitmq_manager = rabbitmq_manager
 
-    async def execute(self) -> None:
+    async def execute(self) -> Future:
         """
         Creates the message and then sends it to RabbitMQ broker.
+
+        Returns:
+            Future: The future that is resolved once the broker has accepted the message.
         """
         message = Message.create(self.message_data)
 
-        await self.rabbitmq_manager.send_message(
-            message_data=message.representation,
-        )
+        return await self.rabbitmq_manager.send_message(message=message)
@@ -0,0 +1,116 @@
+"""
+The CPU cost of permessage-deflate against the bytes it saves.
+
+Every configuration negotiates the extension for a number of connections and compresses
+the delivered messages of the real mix of body sizes, spread over the connections the
+way the hub fans them out. The memory the compressors hold is measured as well, since
+with context takeover every connection keeps its own.
+
+Run with ``python -m benchmarks.compression [--connections 10000] [--messages 5]``.
+"""
+from argparse import ArgumentParser
+from time import process_time
+from tracemalloc import get_traced_memory, start, stop
+
+from websockets.frames import Frame, OP_TEXT
+
+from benchmarks.samples import MESSAGE_MIX, sample_message, sample_text
+
+from settings import settings
+
+from infrastructure.dependency_injector import DependenciesContainer
+from infrastructure.server import ThresholdPerMessageDeflate
+
+
+CONFIGURATIONS = {
+    'websockets defaults': {'window_bits': 15, 'memory_level': 8, 'context_takeover': True, 'min_size': 0},
+    'configured': {
+        'window_bits': settings.websocket_compression_window_bits,
+        'memory_level': settings.websocket_compression_memory_level,
+        'context_takeover': settings.websocket_compression_context_takeover,
+        'min_size': settings.websocket_compression_min_size,
+    },
+    'no threshold': {
+        'window_bits': settings.websocket_compression_window_bits,
+        'memory_level': settings.websocket_compression_memory_level,
+        'context_takeover': settings.websocket_compression_context_takeover,
+        'min_size': 0,
+    },
+    'no context takeover': {
+        'window_bits': settings.websocket_compression_window_bits,
+        'memory_level': settings.websocket_compression_memory_level,
+        'context_takeover': False,
+        'min_size': settings.websocket_compression_min_size,
+    },
+}
+
+
+def create_extension(window_bits: int, memory_level: int, context_takeover: bool, min_size: int):
+    """
+    Create the extension a connection negotiates with the configuration.
+    """
+    return ThresholdPerMessageDeflate(
+        remote_no_context_takeover=False,
+        local_no_context_takeover=not context_takeover,
+        remote_max_window_bits=15,
+        local_max_window_bits=window_bits,
+        compress_settings={'memLevel': memory_level},
+        min_size=min_size,
+    )
+
+
+def measure(configuration: dict, connections: int, payloads: list) -> tuple[float, int, float]:
+    """
+    Compress the payloads with the configuration.
+
+    Returns:
+        tuple: CPU microseconds per message, compressed bytes and megabytes held by the compressors.
+    """
+    start()
+    extensions = [create_extension(**configuration) for _ in range(connections)]
+    memory, _ = get_traced_memory()
+    stop()
+
+    compressed = 0
+    started_at = process_time()
+
+    for index, payload in enumerate(payloads):
+        frame = extensions[index % connections].encode(Frame(OP_TEXT, payload))
+        compressed += len(frame.data)
+
+    elapsed = process_time() - started_at
+
+    return elapsed / len(payloads) * 1_000_000, compressed, memory / 1024 / 1024
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument('--connections', type=int, default=10_000, help='The amount of connections.')
+    parser.add_argument('--messages', type=int, default=5, help='The amount of messages every connection gets.')
+    arguments = parser.parse_args()
+
+    codec = DependenciesContainer.codec()
+    payloads = []
+
+    for index in range(arguments.connections * arguments.messages):
+        message = sample_message(body_size=0, sender_id=index % 97, recipient_id=index % 89)
+        message['body'] = sample_text(size=MESSAGE_MIX[index % len(MESSAGE_MIX)], seed=index)
+        payloads.append(codec.encode(message))
+
+    original = sum(len(payload) for payload in payloads)
+
+    print(f'{arguments.connections} connections, {len(payloads)} messages, {original / len(payloads):.0f} bytes on average')
+    print(f'{"configuration":>20} {"us/msg":>8} {"bytes saved":>12} {"MB held":>8}')
+    print(f'{"uncompressed":>20} {0:>8.2f} {0:>11.0%} {0:>8.0f}')
+
+    for name, configuration in CONFIGURATIONS.items():
+        cpu, compressed, memory = measure(
+            configuration=configuration,
+            connections=arguments.connections,
+            payloads=payloads,
+        )
+        print(f'{name:>20} {cpu:>8.2f} {1 - compressed / original:>11.0%} {memory:>8.0f}')
+
+
+if __name__ == '__main__':
+    main()
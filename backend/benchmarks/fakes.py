@@ -0,0 +1,173 @@
+"""
+In-process stand-ins for RabbitMQ and Redis.
+
+The fakes implement the ports the application talks to, so the real application can be
+run and loaded on a box without any network services. The RabbitMQ fake plays the
+storage service as well: every sent message comes back to the process as a delivery for
+its sender and recipient, the same way the passthrough consumption creates it.
+"""
+from asyncio import Event, Future, get_running_loop, Queue, QueueFull, sleep
+from collections.abc import Callable
+from itertools import count
+
+from dependency_injector.providers import Singleton
+
+from settings import settings
+
+from application.ports import RabbitMQManagerPort, RedisManagerPort
+from domain.entities import Message
+from infrastructure.codecs import Codec, MessageSerializer
+from infrastructure.dependency_injector import DependenciesContainer
+from infrastructure.transport import Delivery, message_queue
+
+
+class FakeRabbitMQManager(RabbitMQManagerPort):
+    """
+    The broker and the storage service in one in-memory queue.
+    """
+
+    def __init__(self, process_id: str, codec: Codec) -> None:
+        """
+        Initialize the fake.
+
+        Args:
+            process_id (str): The id of the process.
+            codec (Codec): The codec the messages are encoded with.
+        """
+        self.process_id = process_id
+        self.codec = codec
+        self.serializer = MessageSerializer(codec=codec, omit_defaults=settings.omit_default_message_fields)
+        self.stored: Queue[tuple[int, Message, bytes]] = Queue()
+        self.message_ids = count(1)
+        self.sent_messages = 0
+        self.sent_receipts = 0
+
+    async def start(self) -> None:
+        """
+        Nothing to connect to.
+        """
+
+    async def consume(self) -> None:
+        """
+        Dispatch the stored messages to the hub as the real consumer does.
+        """
+        while True:
+            message_id, message, body = await self.stored.get()
+
+            delivery = Delivery(
+                message_data=None,
+                user_ids={message.sender_id, message.recipient_id},
+                recipient_id=message.recipient_id,
+                message_id=message_id,
+            )
+            delivery.payload = body.decode('utf-8')
+
+            while True:
+                await message_queue.wait_until_accepting()
+
+                try:
+                    message_queue.put_nowait(delivery)
+                except QueueFull:
+                    await sleep(0.001)
+                    continue
+
+                break
+
+            delivery.release()
+
+    async def send_message(self, message: Message) -> Future:
+        """
+        Serialize a message and store it right away.
+
+        Args:
+            message (Message): The message entity.
+
+        Returns:
+            Future: The already resolved confirm of the message.
+        """
+        body = self.serializer.serialize(message=message)
+        self.stored.put_nowait((next(self.message_ids), message, body))
+        self.sent_messages += 1
+
+        return self.confirm()
+
+    async def send_receipts(self, receipts: list) -> Future:
+        """
+        Drop a batch of delivery receipts.
+
+        Args:
+            receipts (list): The [message_id, delivered_at] pairs of the delivered messages.
+
+        Returns:
+            Future: The already resolved confirm of the batch.
+        """
+        self.sent_receipts += len(receipts)
+
+        return self.confirm()
+
+    def confirm(self) -> Future:
+        """
+        Create a resolved confirm.
+        """
+        future = get_running_loop().create_future()
+        future.set_result(None)
+
+        return future
+
+    async def close(self) -> None:
+        """
+        Nothing to close.
+        """
+
+
+class FakeRedisManager(RedisManagerPort):
+    """
+    The connection mappings and the connection passes kept in dictionaries.
+    """
+
+    def __init__(self, process_id: str) -> None:
+        """
+        Initialize the fake.
+
+        Args:
+            process_id (str): The id of the process.
+        """
+        self.process_id = process_id
+        self.connected_users: set[int] = set()
+        self.connection_passes: dict[str, str] = {}
+
+    async def map_connection(self, user_id: int) -> None:
+        self.connected_users.add(user_id)
+
+    async def remove_mapping(self, user_id: int) -> None:
+        self.connected_users.discard(user_id)
+
+    async def add_connection_pass(self, connection_pass: str, user_id: int) -> None:
+        self.connection_passes[connection_pass] = str(user_id)
+
+    async def retrieve_user_id_from_pass(self, connection_pass: str) -> str | None:
+        return self.connection_passes.pop(connection_pass, None)
+
+    async def heartbeat(self, connected_user_ids: Callable[[], list[int]]) -> None:
+        await Event().wait()
+
+    async def sweep(self) -> None:
+        await Event().wait()
+
+    async def close(self) -> None:
+        self.connected_users.clear()
+        self.connection_passes.clear()
+
+
+def override_services() -> None:
+    """
+    Replace RabbitMQ and Redis with the fakes in the dependencies container.
+
+    Must be called before the lifespan of the application starts.
+    """
+    DependenciesContainer.rabbitmq_manager.override(
+        Singleton(FakeRabbitMQManager, process_id=DependenciesContainer.process_id, codec=DependenciesContainer.codec),
+    )
+    DependenciesContainer.redis_manager.override(
+        Singleton(FakeRedisManager, process_id=DependenciesContainer.process_id),
+    )
@@ -0,0 +1,77 @@
+"""
+The CPU spent on an inbound frame from its raw data to the broker body.
+
+Compares the slow path of the websocket handler (decode, DTO and model_dump, controller,
+use case, Message.create and serialization) with the single-pass inbound pipeline.
+The broker port serializes the message and returns a resolved future, so only the work
+done on the websocket side is measured.
+
+Run with ``python -m benchmarks.inbound_pipeline``.
+"""
+from asyncio import Future, get_running_loop, run
+from time import perf_counter
+
+from benchmarks.samples import MESSAGE_MIX, sample_incoming_frame
+
+from settings import settings
+
+from application.ports import RabbitMQManagerPort
+from domain.entities import Message
+from infrastructure.codecs import MessageSerializer
+from infrastructure.dependency_injector import DependenciesContainer
+from infrastructure.inbound import InboundMessagePipeline
+from infrastructure.incoming_dtos import IncomingMessageDTO
+from interface_adapters.controllers import SendMessageController
+
+
+ROUNDS = 2000
+
+
+class SerializingRabbitMQManager(RabbitMQManagerPort):
+    """
+    The broker port that only serializes the messages.
+    """
+
+    def __init__(self, serializer: MessageSerializer) -> None:
+        self.serializer = serializer
+
+    async def send_message(self, message: Message) -> Future:
+        self.serializer.serialize(message=message)
+        future = get_running_loop().create_future()
+        future.set_result(None)
+        return future
+
+
+async def slow_path(frame: bytes, codec, rabbitmq_manager: RabbitMQManagerPort) -> None:
+    message_data = codec.decode(frame)
+    incoming_message = IncomingMessageDTO(**message_data).model_dump()
+    controller = SendMessageController(sender_id=1, incoming_message=incoming_message, rabbitmq_manager=rabbitmq_manager)
+    await controller.send_message()
+
+
+async def main() -> None:
+    codec = DependenciesContainer.codec()
+    rabbitmq_manager = SerializingRabbitMQManager(
+        serializer=MessageSerializer(codec=codec, omit_defaults=settings.omit_default_message_fields),
+    )
+    inbound_pipeline = InboundMessagePipeline(sender_id=1, rabbitmq_manager=rabbitmq_manager)
+    frames = [codec.encode(sample_incoming_frame(body_size=body_size)) for body_size in MESSAGE_MIX]
+
+    started_at = perf_counter()
+    for _ in range(ROUNDS):
+        for frame in frames:
+            await slow_path(frame=frame, codec=codec, rabbitmq_manager=rabbitmq_manager)
+    slow = (perf_counter() - started_at) / (ROUNDS * len(frames)) * 1_000_000
+
+    started_at = perf_counter()
+    for _ in range(ROUNDS):
+        for frame in frames:
+            await inbound_pipeline.process(frame=frame)
+    fast = (perf_counter() - started_at) / (ROUNDS * len(frames)) * 1_000_000
+
+    print(f'{"codec":>8} {"slow path us/frame":>19} {"fast path us/frame":>19} {"speedup":>8}')
+    print(f'{codec.name:>8} {slow:>19.2f} {fast:>19.2f} {slow / fast:>7.2f}x')
+
+
+if __name__ == '__main__':
+    run(main())
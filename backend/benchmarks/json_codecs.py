@@ -0,0 +1,48 @@
+"""
+The cost of encoding and decoding the transported messages with every codec.
+
+The messages follow the real mix of body sizes, both the frames sent by clients and
+the messages delivered back to them are measured.
+
+Run with ``python -m benchmarks.json_codecs``.
+"""
+from timeit import timeit
+
+from benchmarks.samples import MESSAGE_MIX, sample_incoming_frame, sample_message
+
+from infrastructure.codecs import MsgspecJSONCodec, OrjsonCodec, StdlibJSONCodec
+
+
+ROUNDS = 2000
+
+CODECS = (StdlibJSONCodec, OrjsonCodec, MsgspecJSONCodec)
+
+
+def measure(function, items: list) -> float:
+    """
+    Measure the average time of a call in microseconds.
+    """
+    return timeit(lambda: [function(item) for item in items], number=ROUNDS) / (ROUNDS * len(items)) * 1_000_000
+
+
+def main() -> None:
+    shapes = {
+        'incoming frame': [sample_incoming_frame(body_size=body_size) for body_size in MESSAGE_MIX],
+        'delivered message': [sample_message(body_size=body_size) for body_size in MESSAGE_MIX],
+    }
+
+    print(f'{"codec":>10} {"shape":>18} {"encode us":>10} {"decode us":>10}')
+
+    for shape, messages in shapes.items():
+        for codec_class in CODECS:
+            codec = codec_class()
+            encoded = [codec.encode(message) for message in messages]
+
+            encode = measure(codec.encode, messages)
+            decode = measure(codec.decode, encoded)
+
+            print(f'{codec.name:>10} {shape:>18} {encode:>10.2f} {decode:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
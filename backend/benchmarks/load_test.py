@@ -0,0 +1,290 @@
+"""
+End-to-end throughput and latency of the application with RabbitMQ and Redis faked.
+
+The real application is served by uvicorn on a local port in a subprocess, with the
+RabbitMQ and Redis managers replaced by the in-process fakes, so nothing but this box is
+needed. The clients are split over a number of processes. Every client issues a
+connection pass with a signed access token, connects to the websocket endpoint and then
+sends messages to its partner at a steady rate, the partners are paired so that every
+message fans out to the sockets of both its sender and its recipient.
+
+Reported are the connects per second, the inbound messages per second the clients got
+through, the fan-out messages per second written back to them and the percentiles of
+the delivery latency, the time from a message being sent to it being received by a
+socket. The send time travels in the body of the message, the clock is the system wide
+monotonic one, so the latency is comparable across the processes.
+
+The default rate stays below the inbound rate limits, raise them with the environment
+variables of the settings when sending faster.
+
+Run with ``python -m benchmarks.load_test [--clients 2000] [--messages 20] [--rate 10]``.
+"""
+from argparse import ArgumentParser
+from asyncio import gather, run, Semaphore, sleep, to_thread, wait_for
+from multiprocessing import Barrier, Process, Queue
+from os import environ
+from random import random
+from signal import SIGTERM
+from statistics import quantiles
+from subprocess import Popen
+from sys import executable
+from time import monotonic, monotonic_ns, time
+from uuid import uuid4
+
+from httpx import AsyncClient, Limits
+from jwt import encode
+from orjson import dumps, loads
+from websockets.asyncio.client import connect
+
+from benchmarks.samples import MESSAGE_MIX, sample_text
+from benchmarks.worker_scaling import wait_for_port
+
+from settings import settings
+
+
+USERS_OFFSET = 2_000_000
+RECEIVE_TIMEOUT = 60
+
+
+def serve(port: int) -> None:
+    """
+    Serve the application with the fakes on a local port until SIGTERM.
+
+    Args:
+        port (int): The port to listen on.
+    """
+    from uvicorn import Config
+
+    from benchmarks.fakes import override_services
+    from infrastructure.server import CompressingWebSocketProtocol, DrainingServer
+
+    override_services()
+
+    config = Config(
+        'main:application',
+        host='127.0.0.1',
+        port=port,
+        loop=settings.launcher_event_loop,
+        ws=CompressingWebSocketProtocol,
+        ws_per_message_deflate=settings.websocket_compression,
+        log_level='warning',
+    )
+    DrainingServer(config=config).run()
+
+
+def start_server(port: int) -> Popen:
+    """
+    Start the server in a subprocess.
+
+    Args:
+        port (int): The port to listen on.
+
+    Returns:
+        Popen: The server process.
+    """
+    return Popen([executable, '-m', 'benchmarks.load_test', '--serve', '--port', str(port)], env=environ.copy())
+
+
+async def connect_client(http: AsyncClient, port: int, user_id: int, semaphore: Semaphore):
+    """
+    Issue a connection pass for the user and connect to the websocket endpoint.
+
+    Returns:
+        ClientConnection: The connected websocket.
+    """
+    async with semaphore:
+        token = encode({'user_id': user_id, 'exp': int(time()) + 600}, settings.key, algorithm=settings.algorithm)
+        response = await http.post(
+            f'http://127.0.0.1:{port}/messages/get-connection-pass',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+        response.raise_for_status()
+
+        return await connect(
+            f'ws://127.0.0.1:{port}/messages/?connection_pass={response.json()["connection_pass"]}',
+            max_queue=None,
+        )
+
+
+async def drive(websocket, partner_id: int, messages: int, rate: float, expected: int) -> tuple[list, int, float]:
+    """
+    Send the messages of a client at a steady rate and receive its deliveries.
+
+    Returns:
+        tuple: The latencies in microseconds, the amount of error frames and the time the last delivery arrived.
+    """
+    latencies = []
+    errors = 0
+    received_at = 0.0
+
+    async def send() -> None:
+        for index in range(messages):
+            body = sample_text(size=MESSAGE_MIX[index % len(MESSAGE_MIX)], seed=index)
+            await websocket.send(dumps({
+                'client_message_id': uuid4().hex,
+                'chat_id': 'load-test',
+                'recipient_id': partner_id,
+                'body': f'{monotonic_ns()} {body}',
+            }).decode())
+            await sleep(1 / rate)
+
+    async def receive() -> None:
+        nonlocal errors, received_at
+
+        while len(latencies) < expected:
+            frame = loads(await websocket.recv())
+            now = monotonic_ns()
+
+            for message_data in (frame if isinstance(frame, list) else [frame]):
+                if 'body' not in message_data:
+                    errors += 1
+                    continue
+
+                latencies.append((now - int(message_data['body'].split(' ', 1)[0])) / 1000)
+                received_at = monotonic()
+
+    await sleep(random() / rate)
+    await gather(send(), wait_for(receive(), timeout=RECEIVE_TIMEOUT))
+
+    return latencies, errors, received_at
+
+
+async def run_clients(port: int, user_ids: list, messages: int, rate: float, connect_concurrency: int, barrier, results) -> None:
+    """
+    Connect the clients of a process, wait for every process and drive the clients.
+    """
+    semaphore = Semaphore(connect_concurrency)
+
+    connecting_at = monotonic()
+
+    async with AsyncClient(limits=Limits(max_connections=connect_concurrency)) as http:
+        websockets = await gather(*(
+            connect_client(http=http, port=port, user_id=user_id, semaphore=semaphore)
+            for user_id in user_ids
+        ))
+
+    connected_at = monotonic()
+
+    await to_thread(barrier.wait)
+
+    sending_at = monotonic()
+    outcomes = await gather(*(
+        drive(
+            websocket=websocket,
+            partner_id=user_id ^ 1,
+            messages=messages,
+            rate=rate,
+            expected=messages * 2,
+        )
+        for websocket, user_id in zip(websockets, user_ids)
+    ), return_exceptions=True)
+
+    await gather(*(websocket.close() for websocket in websockets))
+
+    latencies = []
+    errors = 0
+    timeouts = 0
+    finished_at = sending_at
+
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            timeouts += 1
+            continue
+
+        latencies.extend(outcome[0])
+        errors += outcome[1]
+        finished_at = max(finished_at, outcome[2])
+
+    results.put({
+        'connecting_at': connecting_at,
+        'connected_at': connected_at,
+        'sending_at': sending_at,
+        'finished_at': finished_at,
+        'sent': len(user_ids) * messages,
+        'latencies': latencies,
+        'errors': errors,
+        'timeouts': timeouts,
+    })
+
+
+def client_process(*args) -> None:
+    """
+    The entry point of a client process.
+    """
+    run(run_clients(*args))
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument('--clients', type=int, default=2000, help='The amount of websocket clients, an even number.')
+    parser.add_argument('--messages', type=int, default=20, help='The amount of messages every client sends.')
+    parser.add_argument('--rate', type=float, default=10, help='The messages per second every client sends.')
+    parser.add_argument('--processes', type=int, default=2, help='The amount of client processes.')
+    parser.add_argument('--connect-concurrency', type=int, default=100, help='The connects in flight per process.')
+    parser.add_argument('--port', type=int, default=8102, help='The port for the server.')
+    parser.add_argument('--serve', action='store_true', help='Run the server, used by the benchmark itself.')
+    arguments = parser.parse_args()
+
+    if arguments.serve:
+        serve(port=arguments.port)
+        return
+
+    server = start_server(port=arguments.port)
+
+    try:
+        run(wait_for_port(port=arguments.port))
+
+        user_ids = [USERS_OFFSET + index for index in range(arguments.clients - arguments.clients % 2)]
+        barrier = Barrier(arguments.processes)
+        results = Queue()
+
+        processes = [
+            Process(
+                target=client_process,
+                args=(
+                    arguments.port,
+                    user_ids[index::arguments.processes],
+                    arguments.messages,
+                    arguments.rate,
+                    arguments.connect_concurrency,
+                    barrier,
+                    results,
+                ),
+            )
+            for index in range(arguments.processes)
+        ]
+
+        for process in processes:
+            process.start()
+
+        reports = [results.get() for _ in processes]
+
+        for process in processes:
+            process.join()
+    finally:
+        server.send_signal(SIGTERM)
+        server.wait()
+
+    latencies = [latency for report in reports for latency in report['latencies']]
+    connecting = max(report['connected_at'] for report in reports) - min(report['connecting_at'] for report in reports)
+    sending = max(report['finished_at'] for report in reports) - min(report['sending_at'] for report in reports)
+    sent = sum(report['sent'] for report in reports)
+
+    print(f'{len(user_ids)} clients, {arguments.messages} messages each at {arguments.rate:g} msg/s')
+    print(f'{"connects/s":>22} {len(user_ids) / connecting:>10.0f}')
+    print(f'{"inbound msg/s":>22} {sent / sending:>10.0f}')
+    print(f'{"fan-out msg/s":>22} {len(latencies) / sending:>10.0f}')
+
+    if len(latencies) > 1:
+        percentiles = quantiles(latencies, n=1000, method='inclusive')
+        print(f'{"p50 latency ms":>22} {percentiles[499] / 1000:>10.2f}')
+        print(f'{"p99 latency ms":>22} {percentiles[989] / 1000:>10.2f}')
+        print(f'{"p999 latency ms":>22} {percentiles[998] / 1000:>10.2f}')
+
+    print(f'{"delivered":>22} {len(latencies):>10} of {sent * 2}')
+    print(f'{"error frames":>22} {sum(report["errors"] for report in reports):>10}')
+    print(f'{"timed out clients":>22} {sum(report["timeouts"] for report in reports):>10}')
+
+
+if __name__ == '__main__':
+    main()
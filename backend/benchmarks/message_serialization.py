@@ -0,0 +1,129 @@
+"""
+The time and memory spent to create a message and serialize it for the broker.
+
+Compares the previous regular dataclass with asdict, strftime and json.dumps with the
+slotted Message entity and the precompiled MessageSerializer, with and without the
+default fields.
+
+Run with ``python -m benchmarks.message_serialization``.
+"""
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from json import dumps
+from timeit import timeit
+from tracemalloc import get_traced_memory, reset_peak, start, stop
+
+from benchmarks.samples import sample_incoming_frame
+
+from settings import settings
+
+from domain.entities import Message
+from domain.value_objects import MessageStatus
+from infrastructure.codecs import MessageSerializer, MsgspecJSONCodec, OrjsonCodec, StdlibJSONCodec
+
+
+ROUNDS = 20000
+RETAINED = 10000
+
+
+@dataclass
+class LegacyMessage:
+    """
+    The message entity as it was before the slotted one.
+    """
+    id: int | None
+    client_message_id: str
+    chat_id: str | None
+    sender_id: int
+    recipient_id: int
+    status: MessageStatus
+    sent_at: datetime
+    delivered_at: datetime | None
+    body: str
+    is_edited: bool
+    is_deleted: bool
+
+    @classmethod
+    def create(cls, message_data: dict) -> 'LegacyMessage':
+        return LegacyMessage(
+            id=None,
+            client_message_id=message_data.get('client_message_id'),
+            chat_id=message_data.get('chat_id'),
+            sender_id=message_data.get('sender_id'),
+            recipient_id=message_data.get('recipient_id'),
+            status=MessageStatus.SENT,
+            sent_at=datetime.strftime(datetime.now(), settings.default_datetime_format),
+            delivered_at=None,
+            body=message_data.get('body'),
+            is_edited=False,
+            is_deleted=False,
+        )
+
+
+def legacy_path(message_data: dict) -> bytes:
+    return dumps(asdict(LegacyMessage.create(message_data))).encode('utf-8')
+
+
+def serializer_path(serializer: MessageSerializer):
+    def path(message_data: dict) -> bytes:
+        return serializer.serialize(message=Message.create(message_data))
+    return path
+
+
+def retained_bytes(create, message_data: dict) -> float:
+    """
+    Measure the memory retained by a single entity.
+    """
+    start()
+    entities = [create(message_data) for _ in range(RETAINED)]
+    current, _ = get_traced_memory()
+    stop()
+    del entities
+    return current / RETAINED
+
+
+def peak_bytes(path, message_data: dict) -> int:
+    """
+    Measure the peak of the memory allocated while creating and serializing one message.
+    """
+    start()
+    before, _ = get_traced_memory()
+    reset_peak()
+    path(message_data)
+    _, peak = get_traced_memory()
+    stop()
+    return peak - before
+
+
+def main() -> None:
+    message_data = {**sample_incoming_frame(), 'sender_id': 1}
+
+    paths = {'asdict + json.dumps': legacy_path}
+    for codec_class in (StdlibJSONCodec, OrjsonCodec, MsgspecJSONCodec):
+        for omit_defaults in (False, True):
+            serializer = MessageSerializer(codec=codec_class(), omit_defaults=omit_defaults)
+            name = f'{codec_class.name}{" omit defaults" if omit_defaults else ""}'
+            paths[name] = serializer_path(serializer=serializer)
+
+    print(f'{"entity":>10} {"bytes retained":>15}')
+    print(f'{"legacy":>10} {retained_bytes(LegacyMessage.create, message_data):>15.0f}')
+    print(f'{"slotted":>10} {retained_bytes(Message.create, message_data):>15.0f}')
+    print()
+
+    print(f'{"path":>24} {"us/msg":>8} {"peak bytes":>11} {"wire bytes":>11}')
+    for name, path in paths.items():
+        elapsed = timeit(lambda: path(message_data), number=ROUNDS) / ROUNDS * 1_000_000
+        print(f'{name:>24} {elapsed:>8.2f} {peak_bytes(path, message_data):>11} {len(path(message_data)):>11}')
+
+    timestamps = {
+        'strftime': lambda: datetime.now().strftime(settings.default_datetime_format),
+        'isoformat': lambda: f'{datetime.now().isoformat(timespec="microseconds")}Z',
+    }
+    print()
+    print(f'{"timestamp":>10} {"us":>8}')
+    for name, timestamp in timestamps.items():
+        print(f'{name:>10} {timeit(timestamp, number=ROUNDS) / ROUNDS * 1_000_000:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
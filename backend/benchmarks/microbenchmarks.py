@@ -0,0 +1,278 @@
+"""
+Microbenchmarks of the components on the per-message path with regression thresholds.
+
+Every benchmark times a single component on the real mix of message shapes and reports
+the best of a few repeats in nanoseconds per operation. The results can be saved as the
+baseline and later checked against it, the check fails should any benchmark get slower
+than the baseline by more than the threshold.
+
+The timings only compare on the same machine, so the baseline is recorded on the box
+that runs the check, e.g. by the CI job before a change and checked after it.
+
+Run with ``python -m benchmarks.microbenchmarks [--save | --check] [--threshold 10] [--repeats 5] [--baseline PATH]``.
+"""
+from argparse import ArgumentParser
+from asyncio import gather, run
+from gc import collect, disable, enable
+from json import dumps, loads
+from pathlib import Path
+from platform import machine, python_version
+from time import perf_counter
+
+from benchmarks.samples import MESSAGE_MIX, sample_incoming_frame, sample_message
+from benchmarks.sockets import create_hub, create_websocket, disconnect_everyone
+
+from settings import settings
+
+from domain.entities import Message
+from infrastructure.dependency_injector import DependenciesContainer
+from infrastructure.incoming_dtos import IncomingMessageDTO
+from infrastructure.rabbitmq import RabbitMQDecoder
+from interface_adapters.controllers import SendMessageController
+
+
+BASELINE_PATH = Path(__file__).parent / 'baseline.json'
+REPEATS = 5
+ROUNDS = 2000
+SOCKETS_PER_USER = 256
+
+
+async def rabbitmq_decoder_decode() -> tuple[float, int]:
+    codec = DependenciesContainer.codec()
+    bodies = [codec.encode(sample_message(body_size=body_size)) for body_size in MESSAGE_MIX]
+
+    started_at = perf_counter()
+    for _ in range(ROUNDS):
+        for body in bodies:
+            await RabbitMQDecoder(message=body, codec=codec).decode()
+
+    return perf_counter() - started_at, ROUNDS * len(bodies)
+
+
+async def incoming_dto_validate_json() -> tuple[float, int]:
+    codec = DependenciesContainer.codec()
+    frames = [codec.encode(sample_incoming_frame(body_size=body_size)) for body_size in MESSAGE_MIX]
+
+    started_at = perf_counter()
+    for _ in range(ROUNDS):
+        for frame in frames:
+            IncomingMessageDTO.model_validate_json(frame)
+
+    return perf_counter() - started_at, ROUNDS * len(frames)
+
+
+async def incoming_dto_validate() -> tuple[float, int]:
+    frames = [sample_incoming_frame(body_size=body_size) for body_size in MESSAGE_MIX]
+
+    started_at = perf_counter()
+    for _ in range(ROUNDS):
+        for frame in frames:
+            IncomingMessageDTO(**frame).model_dump()
+
+    return perf_counter() - started_at, ROUNDS * len(frames)
+
+
+async def send_message_controller_prepare_message_data() -> tuple[float, int]:
+    controllers = [
+        SendMessageController(sender_id=1, incoming_message=sample_incoming_frame(body_size=body_size), rabbitmq_manager=None)
+        for body_size in MESSAGE_MIX
+    ]
+
+    started_at = perf_counter()
+    for _ in range(ROUNDS):
+        for controller in controllers:
+            await controller.prepare_message_data()
+
+    return perf_counter() - started_at, ROUNDS * len(controllers)
+
+
+async def message_create() -> tuple[float, int]:
+    messages_data = [
+        sample_incoming_frame(body_size=body_size) | {'sender_id': 1}
+        for body_size in MESSAGE_MIX
+    ]
+
+    started_at = perf_counter()
+    for _ in range(ROUNDS):
+        for message_data in messages_data:
+            Message.create(message_data=message_data)
+
+    return perf_counter() - started_at, ROUNDS * len(messages_data)
+
+
+async def message_representation() -> tuple[float, int]:
+    messages = [
+        Message.create(message_data=sample_incoming_frame(body_size=body_size) | {'sender_id': 1})
+        for body_size in MESSAGE_MIX
+    ]
+
+    started_at = perf_counter()
+    for _ in range(ROUNDS):
+        for message in messages:
+            message.representation
+
+    return perf_counter() - started_at, ROUNDS * len(messages)
+
+
+async def websocket_hub_send() -> tuple[float, int]:
+    hub = create_hub()
+    messages_data = [sample_message(body_size=body_size) for body_size in MESSAGE_MIX]
+    user_ids = {messages_data[0]['sender_id'], messages_data[0]['recipient_id']}
+
+    for user_id in user_ids:
+        for _ in range(2):
+            await hub.connect_user(user_id=user_id, websocket=create_websocket())
+
+    started_at = perf_counter()
+    for _ in range(ROUNDS // 10):
+        for message_data in messages_data:
+            await hub.send(message_data=message_data, user_ids=user_ids)
+
+        for connections in hub.connections.values():
+            for connection in connections.values():
+                await connection.queue.join()
+
+    elapsed = perf_counter() - started_at
+
+    await disconnect_everyone(hub=hub)
+
+    return elapsed, ROUNDS // 10 * len(messages_data)
+
+
+async def websocket_hub_disconnect_user() -> tuple[float, int]:
+    hub = create_hub()
+    websockets = [create_websocket() for _ in range(SOCKETS_PER_USER)]
+
+    for websocket in websockets:
+        await hub.connect_user(user_id=1, websocket=websocket)
+
+    writers = [connection.writer for connection in hub.connections[1].values()]
+
+    started_at = perf_counter()
+    for websocket in websockets:
+        await hub.disconnect_user(user_id=1, websocket=websocket)
+
+    elapsed = perf_counter() - started_at
+
+    await gather(*writers, return_exceptions=True)
+
+    return elapsed, len(websockets)
+
+
+BENCHMARKS = {
+    'rabbitmq_decoder_decode': rabbitmq_decoder_decode,
+    'incoming_dto_validate_json': incoming_dto_validate_json,
+    'incoming_dto_validate': incoming_dto_validate,
+    'send_message_controller_prepare_message_data': send_message_controller_prepare_message_data,
+    'message_create': message_create,
+    'message_representation': message_representation,
+    'websocket_hub_send': websocket_hub_send,
+    'websocket_hub_disconnect_user': websocket_hub_disconnect_user,
+}
+
+
+async def measure(repeats: int) -> dict[str, float]:
+    """
+    Run every benchmark a few times with the garbage collector disabled, as timeit does.
+
+    Args:
+        repeats (int): The amount of measured runs of every benchmark, an extra first run only warms up.
+
+    Returns:
+        dict: The best nanoseconds per operation by benchmark name.
+    """
+    results = {}
+
+    for name, benchmark in BENCHMARKS.items():
+        timings = []
+
+        for _ in range(repeats + 1):
+            collect()
+            disable()
+
+            try:
+                elapsed, operations = await benchmark()
+            finally:
+                enable()
+
+            timings.append(elapsed / operations * 1_000_000_000)
+
+        del timings[0]
+
+        results[name] = min(timings)
+
+    return results
+
+
+def environment() -> dict:
+    """
+    Describe what the timings depend on besides the code.
+    """
+    return {'python': python_version(), 'machine': machine(), 'json_codec': settings.json_codec}
+
+
+def check(results: dict[str, float], baseline: dict, threshold: float) -> bool:
+    """
+    Compare the results with the baseline.
+
+    Args:
+        results (dict): The nanoseconds per operation by benchmark name.
+        baseline (dict): The saved baseline.
+        threshold (float): The slowdown in percent that is considered a regression.
+
+    Returns:
+        bool: Whether no benchmark regressed.
+    """
+    if baseline['environment'] != environment():
+        print(f'The baseline was recorded with {baseline["environment"]}, the timings may not compare.')
+
+    passed = True
+
+    print(f'{"benchmark":>46} {"baseline ns":>12} {"ns/op":>10} {"change":>8}')
+
+    for name, timing in results.items():
+        if (baseline_timing := baseline['results'].get(name)) is None:
+            print(f'{name:>46} {"-":>12} {timing:>10.0f} {"new":>8}')
+            continue
+
+        change = (timing / baseline_timing - 1) * 100
+        regressed = change > threshold
+        passed = passed and not regressed
+
+        print(f'{name:>46} {baseline_timing:>12.0f} {timing:>10.0f} {change:>+7.1f}%{" REGRESSED" if regressed else ""}')
+
+    return passed
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--save', action='store_true', help='Save the results as the baseline.')
+    mode.add_argument('--check', action='store_true', help='Fail should a benchmark regress against the baseline.')
+    parser.add_argument('--threshold', type=float, default=10, help='The slowdown in percent that fails the check.')
+    parser.add_argument('--repeats', type=int, default=REPEATS, help='The runs of every benchmark to take the best of.')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH, help='The path of the baseline file.')
+    arguments = parser.parse_args()
+
+    if arguments.check and not arguments.baseline.exists():
+        raise SystemExit(f'There is no baseline at {arguments.baseline}, record one with --save first.')
+
+    settings.outbound_queue_size = ROUNDS
+
+    results = run(measure(repeats=arguments.repeats))
+
+    if arguments.save:
+        arguments.baseline.write_text(dumps({'environment': environment(), 'results': results}, indent=4) + '\n')
+        print(f'The baseline is saved to {arguments.baseline}.')
+    elif arguments.check:
+        if not check(results=results, baseline=loads(arguments.baseline.read_text()), threshold=arguments.threshold):
+            raise SystemExit(f'A benchmark regressed by more than {arguments.threshold:g}%.')
+        return
+
+    print(f'{"benchmark":>46} {"ns/op":>10}')
+    for name, timing in results.items():
+        print(f'{name:>46} {timing:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Messages per second published with publisher confirms.
+
+Compares waiting for the confirm of every message before publishing the next one with
+the publish pipeline that keeps many confirms in flight.
+
+By default the broker is simulated: every publish is confirmed after a fixed round trip.
+With ``--broker`` the messages are published to the RabbitMQ from RABBITMQ_URL, into a
+temporary queue through the default exchange.
+
+Run with ``python -m benchmarks.publish_pipeline [--broker] [--round-trip 0.0005]``.
+"""
+from argparse import ArgumentParser
+from asyncio import gather, run, sleep
+from json import dumps
+from time import perf_counter
+
+from aio_pika import connect_robust, Message
+
+from benchmarks.samples import sample_message
+
+from settings import settings
+
+from infrastructure.rabbitmq import PublishPipeline
+
+
+MESSAGES = 20000
+
+
+def create_messages() -> list[Message]:
+    """
+    Create the RabbitMQ messages to publish.
+    """
+    return [
+        Message(body=dumps(sample_message()).encode('utf-8'), content_type='application/json', content_encoding='utf-8')
+        for _ in range(MESSAGES)
+    ]
+
+
+async def per_message_confirm(publish, messages: list[Message]) -> float:
+    """
+    Publish the messages one by one waiting for every confirm.
+
+    Returns:
+        float: Messages per second.
+    """
+    started_at = perf_counter()
+    for message in messages:
+        await publish(message)
+    return len(messages) / (perf_counter() - started_at)
+
+
+async def pipelined(publish, messages: list[Message]) -> float:
+    """
+    Publish the messages through the publish pipeline and wait for every confirm.
+
+    Returns:
+        float: Messages per second.
+    """
+    pipeline = PublishPipeline(
+        publish=publish,
+        batch_size=settings.publish_batch_size,
+        flush_interval=settings.publish_flush_interval,
+        max_in_flight=settings.publish_max_in_flight,
+    )
+    pipeline.start()
+
+    started_at = perf_counter()
+    futures = [await pipeline.submit(message=message) for message in messages]
+    await gather(*futures)
+    elapsed = perf_counter() - started_at
+
+    await pipeline.close()
+    return len(messages) / elapsed
+
+
+async def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument('--broker', action='store_true', help='Publish to the RabbitMQ from RABBITMQ_URL.')
+    parser.add_argument('--round-trip', type=float, default=0.0005, help='The simulated confirm round trip in seconds.')
+    arguments = parser.parse_args()
+
+    connection = None
+
+    if arguments.broker:
+        connection = await connect_robust(settings.rabbitmq_url)
+        channel = await connection.channel(publisher_confirms=True)
+        queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+
+        async def publish(message: Message) -> None:
+            await channel.default_exchange.publish(message=message, routing_key=queue.name)
+    else:
+        async def publish(message: Message) -> None:
+            await sleep(arguments.round_trip)
+
+    messages = create_messages()
+
+    legacy = await per_message_confirm(publish=publish, messages=messages)
+    current = await pipelined(publish=publish, messages=messages)
+
+    print(f'{"per-message confirm msg/s":>26} {"pipelined msg/s":>16} {"speedup":>8}')
+    print(f'{legacy:>26.0f} {current:>16.0f} {current / legacy:>7.2f}x')
+
+    if connection is not None:
+        await connection.close()
+
+
+if __name__ == '__main__':
+    run(main())
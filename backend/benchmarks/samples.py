@@ -0,0 +1,105 @@
+"""
+Message shapes used by the benchmarks.
+
+The shapes mirror the messages that travel through the service: the frames sent by
+clients and the messages that come back from the storage service.
+"""
+from random import Random
+from string import ascii_letters
+from uuid import uuid4
+
+
+WORDS = (
+    'the', 'a', 'to', 'and', 'you', 'i', 'it', 'is', 'we', 'that', 'for', 'on', 'in', 'with',
+    'meeting', 'tomorrow', 'today', 'thanks', 'sure', 'call', 'later', 'sounds', 'good', 'see',
+    'deploy', 'review', 'please', 'check', 'done', 'lunch', 'weekend', 'photo', 'address', 'ok',
+)
+
+
+def sample_body(size: int) -> str:
+    """
+    Build a message body of the given size.
+
+    Args:
+        size (int): The length of the body.
+
+    Returns:
+        str: The body text.
+    """
+    return (ascii_letters * (size // len(ascii_letters) + 1))[:size]
+
+
+def sample_text(size: int, seed: int = 0) -> str:
+    """
+    Build a message body of the given size that reads like chat text.
+
+    Unlike sample_body it does not repeat itself, so it compresses like real messages.
+
+    Args:
+        size (int): The length of the body.
+        seed (int): The seed of the words.
+
+    Returns:
+        str: The body text.
+    """
+    random = Random(seed)
+    words = []
+    length = 0
+
+    while length < size:
+        word = random.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+
+    return ' '.join(words)[:size]
+
+
+def sample_incoming_frame(body_size: int = 120, recipient_id: int = 2) -> dict:
+    """
+    Build a frame in the form a client sends it to the websocket endpoint.
+
+    Args:
+        body_size (int): The length of the message body.
+        recipient_id (int): The id of the recipient.
+
+    Returns:
+        dict: The frame data.
+    """
+    return {
+        'client_message_id': uuid4().hex,
+        'chat_id': uuid4().hex,
+        'recipient_id': recipient_id,
+        'body': sample_body(size=body_size),
+    }
+
+
+def sample_message(body_size: int = 120, sender_id: int = 1, recipient_id: int = 2) -> dict:
+    """
+    Build a message in the form it is delivered to the users.
+
+    Args:
+        body_size (int): The length of the message body.
+        sender_id (int): The id of the sender.
+        recipient_id (int): The id of the recipient.
+
+    Returns:
+        dict: The message data.
+    """
+    return {
+        'id': 1024,
+        'client_message_id': uuid4().hex,
+        'chat_id': uuid4().hex,
+        'sender_id': sender_id,
+        'recipient_id': recipient_id,
+        'status': 'sent',
+        'sent_at': '2025-10-18T12:00:00.000000Z',
+        'delivered_at': None,
+        'body': sample_body(size=body_size),
+        'is_edited': False,
+        'is_deleted': False,
+    }
+
+
+# Body sizes that roughly follow the real mix: mostly short messages, some paragraphs
+# and an occasional long paste.
+MESSAGE_MIX = (40, 40, 40, 80, 80, 120, 240, 600, 2000)
@@ -0,0 +1,102 @@
+"""
+In-memory websockets for the benchmarks.
+
+The sockets are real starlette websockets whose ASGI send callable discards the
+frames, so the benchmarks measure everything the application does up to the server.
+"""
+from asyncio import gather
+from uuid import uuid4
+
+from starlette.websockets import WebSocket, WebSocketState
+
+from settings import settings
+
+from infrastructure.dependency_injector import DependenciesContainer
+from infrastructure.websocket_hub import DeliveryReceipts, WebSocketHub
+
+
+async def discard(message: dict) -> None:
+    """
+    The ASGI send callable that drops every frame.
+    """
+
+
+async def discard_receipts(receipts: list) -> None:
+    """
+    The delivery receipts sender that drops every batch.
+    """
+
+
+async def never_receive() -> dict:
+    """
+    The ASGI receive callable of a socket that never gets a frame.
+    """
+    return {'type': 'websocket.disconnect', 'code': 1000}
+
+
+def create_websocket() -> WebSocket:
+    """
+    Create a websocket that discards everything sent to it.
+
+    The client side of the socket is connected, the socket still has to be accepted
+    by the application, which is what the hub does upon connecting a user.
+
+    Returns:
+        WebSocket: An instance of starlette WebSocket.
+    """
+    websocket = WebSocket(
+        scope={
+            'type': 'websocket',
+            'path': '/messages/',
+            'headers': [],
+            'query_string': b'',
+            'subprotocols': [],
+            'websocket_id': uuid4().hex,
+        },
+        receive=never_receive,
+        send=discard,
+    )
+    websocket.client_state = WebSocketState.CONNECTED
+
+    return websocket
+
+
+def create_hub() -> WebSocketHub:
+    """
+    Create a hub with the codec from the settings whose delivery receipts are discarded.
+
+    Returns:
+        WebSocketHub: A new hub.
+    """
+    delivery_receipts = DeliveryReceipts(
+        send=discard_receipts,
+        batch_size=settings.delivery_receipts_batch_size,
+        flush_interval=settings.delivery_receipts_flush_interval,
+        recent_size=settings.delivery_receipts_recent_size,
+    )
+    return WebSocketHub(
+        codec=DependenciesContainer.codec(),
+        delivery_receipts=delivery_receipts,
+        subprotocol_codecs=DependenciesContainer.subprotocol_codecs(),
+    )
+
+
+async def disconnect_everyone(hub: WebSocketHub) -> None:
+    """
+    Disconnect every socket of the hub and wait for their writers to stop.
+
+    Args:
+        hub (WebSocketHub): The hub to empty.
+    """
+    writers = [
+        connection.writer
+        for connections in hub.connections.values()
+        for connection in connections.values()
+        if connection.writer is not None
+    ]
+
+    for user_id, connections in list(hub.connections.items()):
+        for connection in list(connections.values()):
+            await hub.disconnect_user(user_id=user_id, websocket=connection.websocket)
+
+    await gather(*writers, return_exceptions=True)
@@ -0,0 +1,53 @@
+"""
+The size and the CPU cost of the frames of every websocket subprotocol.
+
+The JSON codec configured for the hub is compared with the binary subprotocols on the real
+mix of body sizes, both the frames sent by clients and the messages delivered to them.
+
+Run with ``python -m benchmarks.subprotocols``.
+"""
+from timeit import timeit
+
+from benchmarks.samples import MESSAGE_MIX, sample_incoming_frame, sample_message
+
+from infrastructure.dependency_injector import DependenciesContainer
+
+
+ROUNDS = 2000
+
+
+def measure(function, items: list) -> float:
+    """
+    Measure the average time of a call in microseconds.
+    """
+    return timeit(lambda: [function(item) for item in items], number=ROUNDS) / (ROUNDS * len(items)) * 1_000_000
+
+
+def main() -> None:
+    shapes = {
+        'incoming frame': [sample_incoming_frame(body_size=body_size) for body_size in MESSAGE_MIX],
+        'delivered message': [sample_message(body_size=body_size) for body_size in MESSAGE_MIX],
+    }
+    codecs = {'json': DependenciesContainer.codec()} | DependenciesContainer.subprotocol_codecs()
+
+    print(f'{"subprotocol":>12} {"shape":>18} {"bytes":>8} {"size":>7} {"encode us":>10} {"decode us":>10}')
+
+    for shape, messages in shapes.items():
+        baseline = None
+
+        for subprotocol, codec in codecs.items():
+            encoded = [codec.encode(message) for message in messages]
+            size = sum(len(frame.encode() if isinstance(frame, str) else frame) for frame in encoded) / len(encoded)
+            baseline = baseline or size
+
+            encode = measure(codec.encode, messages)
+            decode = measure(codec.decode, encoded)
+
+            print(
+                f'{subprotocol:>12} {shape:>18} {size:>8.0f} {size / baseline:>6.0%}'
+                f' {encode:>10.2f} {decode:>10.2f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+The cost of fanning a message out to the sockets of its sender and recipient.
+
+Compares the per-socket send_json path with the hub that encodes the message once and
+queues the same payload for every socket, for a growing number of sockets per user.
+The time of the hub includes the writer tasks flushing the queues to the sockets.
+
+Run with ``python -m benchmarks.websocket_hub_send``.
+"""
+from asyncio import run, sleep
+from time import perf_counter
+
+from benchmarks.samples import sample_message
+from benchmarks.sockets import create_hub, create_websocket, disconnect_everyone
+
+from settings import settings
+
+from infrastructure.websocket_hub import WebSocketHub
+
+
+SOCKETS_PER_USER = (1, 2, 4, 8, 16, 32)
+MESSAGES = 2000
+
+
+async def send_json_per_socket(hub: WebSocketHub, message_data: dict, user_ids: set) -> None:
+    """
+    The previous fan-out path that encodes the message for every socket.
+    """
+    for user_id in user_ids:
+        if (connections := hub.connections.get(user_id)) is not None:
+            for connection in connections.values():
+                await connection.websocket.send_json(message_data)
+
+
+async def encode_once(hub: WebSocketHub, message_data: dict, user_ids: set) -> None:
+    """
+    The hub fan-out path that encodes the message once.
+    """
+    await hub.send(message_data=message_data, user_ids=user_ids)
+
+
+async def flush(hub: WebSocketHub) -> None:
+    """
+    Wait for the writers of the hub to write every queued frame.
+    """
+    while any(not connection.queue.empty() for connections in hub.connections.values() for connection in connections.values()):
+        await sleep(0)
+
+
+async def measure(send, hub: WebSocketHub, message_data: dict, user_ids: set) -> float:
+    """
+    Measure the average time spent per message in microseconds.
+    """
+    started_at = perf_counter()
+    for _ in range(MESSAGES):
+        await send(hub, message_data, user_ids)
+    await flush(hub=hub)
+    return (perf_counter() - started_at) / MESSAGES * 1_000_000
+
+
+async def main() -> None:
+    message_data = sample_message(body_size=240)
+    user_ids = {message_data['sender_id'], message_data['recipient_id']}
+
+    print(f'{"sockets":>8} {"send_json us/msg":>18} {"encode once us/msg":>20} {"speedup":>8}')
+
+    settings.outbound_queue_size = MESSAGES
+
+    for sockets_per_user in SOCKETS_PER_USER:
+        hub = create_hub()
+        for user_id in user_ids:
+            for _ in range(sockets_per_user):
+                await hub.connect_user(user_id=user_id, websocket=create_websocket())
+
+        legacy = await measure(send_json_per_socket, hub, message_data, user_ids)
+        current = await measure(encode_once, hub, message_data, user_ids)
+
+        await disconnect_everyone(hub=hub)
+
+        print(f'{sockets_per_user * 2:>8} {legacy:>18.2f} {current:>20.2f} {legacy / current:>7.2f}x')
+
+
+if __name__ == '__main__':
+    run(main())
@@ -0,0 +1,192 @@
+"""
+Inbound messages per second with a growing amount of launcher workers.
+
+For every amount of workers the launcher is started on a local port, the clients connect
+with signed access tokens and connection passes and send messages as fast as they can,
+so the launcher runs with the inbound rate limits disabled.
+The throughput is measured on the broker side: a temporary queue is bound to the database
+exchange and the messages are counted as they arrive.
+
+Unlike the other benchmarks this one needs the Redis and the RabbitMQ from REDIS_URL and
+RABBITMQ_URL with the exchanges declared. The database exchange also delivers the messages
+to its regular consumers, so use a dedicated virtual host.
+
+Run with ``python -m benchmarks.worker_scaling [--workers 1 2 4] [--clients 64] [--messages 200]``.
+"""
+from argparse import ArgumentParser
+from asyncio import Event, gather, open_connection, run, sleep, wait_for
+from json import dumps
+from os import environ
+from signal import SIGTERM
+from subprocess import Popen
+from sys import executable
+from time import perf_counter, time
+
+from aio_pika import connect_robust
+from httpx import AsyncClient
+from jwt import encode
+from websockets.asyncio.client import connect
+
+from benchmarks.samples import sample_incoming_frame
+
+from settings import settings
+
+
+STARTUP_TIMEOUT = 30
+MEASUREMENT_TIMEOUT = 120
+
+
+def start_launcher(workers: int, port: int) -> Popen:
+    """
+    Start the launcher in a subprocess.
+
+    Args:
+        workers (int): The amount of workers.
+        port (int): The port to listen on.
+
+    Returns:
+        Popen: The launcher process.
+    """
+    environment = environ | {
+        'LAUNCHER_HOST': '127.0.0.1',
+        'LAUNCHER_PORT': str(port),
+        'LAUNCHER_WORKERS_COUNT': str(workers),
+        'RATE_LIMITING': 'false',
+    }
+    return Popen([executable, 'launcher.py'], env=environment)
+
+
+async def wait_for_port(port: int) -> None:
+    """
+    Wait until the launcher accepts connections.
+
+    Args:
+        port (int): The port the launcher listens on.
+    """
+    deadline = perf_counter() + STARTUP_TIMEOUT
+
+    while perf_counter() < deadline:
+        try:
+            _, writer = await open_connection('127.0.0.1', port)
+        except OSError:
+            await sleep(0.1)
+            continue
+
+        writer.close()
+        await writer.wait_closed()
+        return
+
+    raise TimeoutError(f'The launcher did not start listening on {port}.')
+
+
+async def connect_client(http: AsyncClient, port: int, user_id: int):
+    """
+    Issue a connection pass for the user and connect to the websocket endpoint.
+
+    Args:
+        http (AsyncClient): The HTTP client.
+        port (int): The port the launcher listens on.
+        user_id (int): The id of the user.
+
+    Returns:
+        ClientConnection: The connected websocket.
+    """
+    token = encode({'user_id': user_id, 'exp': int(time()) + 600}, settings.key, algorithm=settings.algorithm)
+    response = await http.post(
+        f'http://127.0.0.1:{port}/messages/get-connection-pass',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    response.raise_for_status()
+
+    return await connect(f'ws://127.0.0.1:{port}/messages/?connection_pass={response.json()["connection_pass"]}')
+
+
+async def measure(workers: int, clients: int, messages: int, port: int, channel) -> float:
+    """
+    Measure the throughput of the launcher with the given amount of workers.
+
+    Returns:
+        float: Messages per second.
+    """
+    expected = clients * messages
+    received = 0
+    completed = Event()
+
+    exchange = await channel.get_exchange(settings.database_exchange_name, ensure=True)
+    queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+    await queue.bind(exchange, routing_key='')
+
+    async def count(message) -> None:
+        nonlocal received
+        received += 1
+        if received == expected:
+            completed.set()
+
+    consumer_tag = await queue.consume(count, no_ack=True)
+
+    launcher = start_launcher(workers=workers, port=port)
+
+    try:
+        await wait_for_port(port=port)
+
+        async with AsyncClient() as http:
+            websockets = await gather(*(
+                connect_client(http=http, port=port, user_id=1_000_000 + index)
+                for index in range(clients)
+            ))
+
+        frames = [dumps(sample_incoming_frame(recipient_id=index + 1)) for index in range(messages)]
+
+        async def send(websocket) -> None:
+            for frame in frames:
+                await websocket.send(frame)
+
+        started_at = perf_counter()
+        await gather(*(send(websocket) for websocket in websockets))
+        await wait_for(completed.wait(), timeout=MEASUREMENT_TIMEOUT)
+        elapsed = perf_counter() - started_at
+
+        await gather(*(websocket.close() for websocket in websockets))
+    finally:
+        launcher.send_signal(SIGTERM)
+        launcher.wait()
+
+        await queue.cancel(consumer_tag)
+        await queue.delete(if_unused=False, if_empty=False)
+
+    return expected / elapsed
+
+
+async def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='The amounts of workers to compare.')
+    parser.add_argument('--clients', type=int, default=64, help='The amount of connected clients.')
+    parser.add_argument('--messages', type=int, default=200, help='The amount of messages every client sends.')
+    parser.add_argument('--port', type=int, default=8101, help='The port for the launcher.')
+    arguments = parser.parse_args()
+
+    connection = await connect_robust(settings.rabbitmq_url)
+    channel = await connection.channel()
+
+    results = {}
+
+    for workers in arguments.workers:
+        results[workers] = await measure(
+            workers=workers,
+            clients=arguments.clients,
+            messages=arguments.messages,
+            port=arguments.port,
+            channel=channel,
+        )
+
+    await connection.close()
+
+    baseline = results[arguments.workers[0]]
+
+    print(f'{"workers":>8} {"msg/s":>10} {"scaling":>8}')
+    for workers, throughput in results.items():
+        print(f'{workers:>8} {throughput:>10.0f} {throughput / baseline:>7.2f}x')
+
+
+if __name__ == '__main__':
+    run(main())
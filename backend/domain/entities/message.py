@@ -6,7 +6,7 @@
 
 
 
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from datetime import datetime
 
 from settings import settings
@@ -14,7 +14,24 @@ from settings import settings
 from domain.value_objects import MessageStatus
 
 
-@dataclass
+# The default datetime format is the ISO format with microseconds, which datetime
+# produces several times faster with isoformat than with strftime.
+ISO_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+
+def current_timestamp() -> str:
+    """
+    Format the current moment with the default datetime format.
+
+    Returns:
+        str: The formatted timestamp.
+    """
+    if settings.default_datetime_format == ISO_DATETIME_FORMAT:
+        return f'{datetime.now().isoformat(timespec="microseconds")}Z'
+    return datetime.now().strftime(settings.default_datetime_format)
+
+
+@dataclass(slots=True)
 class Message:
     """
     Domain entity representing a chat message.
@@ -53,12 +70,25 @@ class Message:
         """
         Convert the message entity into a serializable dictionary.
 
-        Used for JSON serialization and sending through RabbitMQ.
+        Used for JSON serialization. The fields are flat, so the dictionary is built
+        directly instead of deep copying the entity.
 
         Returns:
             dict: The serializible representation of the Message entity.
         """
-        return asdict(self)
+        return {
+            'id': self.id,
+            'client_message_id': self.client_message_id,
+            'chat_id': self.chat_id,
+            'sender_id': self.sender_id,
+            'recipient_id': self.recipient_id,
+            'status': self.status,
+            'sent_at': self.sent_at,
+            'delivered_at': self.delivered_at,
+            'body': self.body,
+            'is_edited': self.is_edited,
+            'is_deleted': self.is_deleted,
+        }
 
     @classmethod
     def create(cls, message_data: dict) -> 'Message':
@@ -71,16 +101,46 @@ class Message:
         Returns:
             Message: A new Message object.
         """
-        return Message(
-            id=None,
+        return cls.compose(
             client_message_id=message_data.get('client_message_id'),
             chat_id=message_data.get('chat_id'),
             sender_id=message_data.get('sender_id'),
             recipient_id=message_data.get('recipient_id'),
+            body=message_data.get('body'),
+        )
+
+    @classmethod
+    def compose(
+        cls,
+        client_message_id: str,
+        chat_id: str | None,
+        sender_id: int,
+        recipient_id: int,
+        body: str,
+    ) -> 'Message':
+        """
+        Factory method for constructing a new Message entity from separate values.
+
+        Args:
+            client_message_id (str): Client-generated unique message ID for idempotency.
+            chat_id (str | None): Chat identifier.
+            sender_id (int): ID of the user who sent the message.
+            recipient_id (int): ID of the user receiving the message.
+            body (str): The actual message text.
+
+        Returns:
+            Message: A new Message object.
+        """
+        return Message(
+            id=None,
+            client_message_id=client_message_id,
+            chat_id=chat_id,
+            sender_id=sender_id,
+            recipient_id=recipient_id,
             status=MessageStatus.SENT,
-            sent_at=datetime.strftime(datetime.now(), settings.default_datetime_format),
+            sent_at=current_timestamp(),
             delivered_at=None,
-            body=message_data.get('body'),
+            body=body,
             is_edited=False,
             is_deleted=False,
         )
@@ -0,0 +1 @@
+from infrastructure.batching.batcher import Batcher
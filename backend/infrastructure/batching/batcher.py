@@ -0,0 +1,81 @@
+from asyncio import create_task, Event, Task, wait_for
+from collections.abc import Awaitable, Callable
+
+
+class Batcher:
+    """
+    The flusher of the batches collected by size and by time.
+
+    The owner of a batch keeps its items and reports the size of the batch as items are
+    added. The batch is flushed once it is full or once the flush interval has passed
+    since its first item, the owner reports what is left after taking it.
+    """
+
+    def __init__(self, flush: Callable[[], Awaitable], batch_size: int, flush_interval: float) -> None:
+        """
+        Initialize the batcher.
+
+        Args:
+            flush (Callable): The coroutine function that takes and flushes the current batch.
+            batch_size (int): The amount of items that flushes a batch right away.
+            flush_interval (float): The maximum time in seconds an item waits for its batch to be flushed.
+        """
+        self.flush = flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.batch_started = Event()
+        self.batch_full = Event()
+        self.flusher: Task | None = None
+
+    def start(self) -> None:
+        """
+        Start flushing the batches unless already started.
+        """
+        if self.flusher is None:
+            self.flusher = create_task(self.flush_periodically())
+
+    def added(self, size: int) -> None:
+        """
+        Report an item added to the current batch.
+
+        Args:
+            size (int): The amount of items in the batch.
+        """
+        if size == 1:
+            self.batch_started.set()
+        if size >= self.batch_size:
+            self.batch_full.set()
+
+    def taken(self, remaining: int = 0) -> None:
+        """
+        Report the current batch taken for a flush.
+
+        Args:
+            remaining (int): The amount of items left for the next batch.
+        """
+        if not remaining:
+            self.batch_started.clear()
+        if remaining < self.batch_size:
+            self.batch_full.clear()
+
+    async def flush_periodically(self) -> None:
+        """
+        Flush the current batch once it is full or its flush interval has passed.
+        """
+        while True:
+            await self.batch_started.wait()
+
+            try:
+                await wait_for(self.batch_full.wait(), timeout=self.flush_interval)
+            except TimeoutError:
+                pass
+
+            await self.flush()
+
+    def stop(self) -> None:
+        """
+        Stop flushing periodically, the owner flushes what is left.
+        """
+        if self.flusher is not None:
+            self.flusher.cancel()
+            self.flusher = None
@@ -0,0 +1,7 @@
+from infrastructure.codecs.cbor import CBORCodec
+from infrastructure.codecs.codec import Codec
+from infrastructure.codecs.message_serializer import MessageSerializer
+from infrastructure.codecs.msgpack import MsgpackCodec
+from infrastructure.codecs.msgspec_json import MsgspecJSONCodec
+from infrastructure.codecs.orjson_json import OrjsonCodec
+from infrastructure.codecs.stdlib_json import StdlibJSONCodec
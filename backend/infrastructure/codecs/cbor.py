@@ -0,0 +1,48 @@
+from struct import pack
+from typing import Any
+
+from cbor2 import CBORDecodeError, dumps, loads
+
+from infrastructure.codecs.codec import Codec
+
+
+class CBORCodec(Codec):
+    """
+    The CBOR codec built on cbor2 for the clients that negotiate the binary subprotocol.
+    """
+
+    name = 'cbor'
+    binary = True
+
+    def encode(self, data: Any) -> bytes:
+        """
+        Encode the data straight to bytes.
+        """
+        return dumps(data)
+
+    def decode(self, data: bytes | str) -> Any:
+        """
+        Decode the data, raising ValueError instead of the cbor2 decoding error.
+        """
+        if isinstance(data, str):
+            raise ValueError('CBOR is carried by binary frames only.')
+
+        try:
+            return loads(data)
+        except CBORDecodeError as exception:
+            raise ValueError(str(exception)) from exception
+
+    def join(self, frames: list[bytes]) -> bytes:
+        """
+        Join encoded objects into an encoded array by prepending the array header.
+        """
+        if len(frames) < 24:
+            header = bytes((0x80 | len(frames),))
+        elif len(frames) < 0x100:
+            header = pack('>BB', 0x98, len(frames))
+        elif len(frames) < 0x10000:
+            header = pack('>BH', 0x99, len(frames))
+        else:
+            header = pack('>BI', 0x9a, len(frames))
+
+        return header + b''.join(frames)
@@ -0,0 +1,56 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+
+class Codec(ABC):
+    """
+    The codec that turns the transported messages into bytes and back.
+
+    Every codec encodes straight to bytes. Decoding accepts both bytes and text and
+    raises ValueError should the data be malformed. The data of binary codecs travels
+    in binary websocket frames, the data of the rest in text frames.
+    """
+
+    name: str
+    binary: bool = False
+
+    @abstractmethod
+    def encode(self, data: Any) -> bytes:
+        """
+        Encode the data.
+
+        Args:
+            data (Any): A serializable object.
+
+        Returns:
+            bytes: The encoded data.
+        """
+        ...
+
+    @abstractmethod
+    def decode(self, data: bytes | str) -> Any:
+        """
+        Decode the data.
+
+        Args:
+            data (bytes | str): The encoded data.
+
+        Returns:
+            Any: The decoded object.
+
+        Raises:
+            ValueError: Raisen if the data can not be decoded.
+        """
+        ...
+
+    def join(self, frames: list[bytes]) -> bytes:
+        """
+        Join encoded objects into an encoded array without decoding them.
+
+        Args:
+            frames (list[bytes]): The encoded objects.
+
+        Returns:
+            bytes: The encoded array.
+        """
+        return b'[' + b','.join(frames) + b']'
@@ -0,0 +1,64 @@
+from dataclasses import fields
+from operator import attrgetter
+
+from domain.entities import Message
+from infrastructure.codecs.codec import Codec
+
+
+# The fields whose default values may be left out of the wire format.
+OMITTABLE_DEFAULTS = {
+    'id': None,
+    'chat_id': None,
+    'delivered_at': None,
+    'is_edited': False,
+    'is_deleted': False,
+}
+
+REQUIRED = object()
+
+
+class MessageSerializer:
+    """
+    The serializer that writes Message entities into the wire format.
+
+    The fields of the entity and the defaults that may be omitted are resolved once upon
+    initialization. Serializing a message reads every field in one call, builds the
+    wire representation in a single pass and hands it to the codec.
+    """
+
+    def __init__(self, codec: Codec, omit_defaults: bool) -> None:
+        """
+        Initialize the serializer.
+
+        Args:
+            codec (Codec): The codec the messages are encoded with.
+            omit_defaults (bool): Whether the fields holding their default values are left out.
+        """
+        self.codec = codec
+        self.omit_defaults = omit_defaults
+        self.names = tuple(field.name for field in fields(Message))
+        self.defaults = tuple(OMITTABLE_DEFAULTS.get(name, REQUIRED) for name in self.names)
+        self.read_values = attrgetter(*self.names)
+
+    def serialize(self, message: Message) -> bytes:
+        """
+        Serialize a message.
+
+        Args:
+            message (Message): A message entity.
+
+        Returns:
+            bytes: The encoded message.
+        """
+        values = self.read_values(message)
+
+        if self.omit_defaults:
+            representation = {
+                name: value
+                for name, value, default in zip(self.names, values, self.defaults)
+                if value is not default
+            }
+        else:
+            representation = dict(zip(self.names, values))
+
+        return self.codec.encode(representation)
@@ -0,0 +1,54 @@
+from struct import pack
+from typing import Any
+
+from msgspec import DecodeError
+from msgspec.msgpack import Decoder, Encoder
+
+from infrastructure.codecs.codec import Codec
+
+
+class MsgpackCodec(Codec):
+    """
+    The MessagePack codec built on msgspec for the clients that negotiate the binary subprotocol.
+    """
+
+    name = 'msgpack'
+    binary = True
+
+    def __init__(self) -> None:
+        """
+        Initialize the codec with a reusable encoder and decoder.
+        """
+        self.encoder = Encoder()
+        self.decoder = Decoder()
+
+    def encode(self, data: Any) -> bytes:
+        """
+        Encode the data straight to bytes.
+        """
+        return self.encoder.encode(data)
+
+    def decode(self, data: bytes | str) -> Any:
+        """
+        Decode the data, raising ValueError instead of the msgspec decoding error.
+        """
+        if isinstance(data, str):
+            raise ValueError('MessagePack is carried by binary frames only.')
+
+        try:
+            return self.decoder.decode(data)
+        except DecodeError as exception:
+            raise ValueError(str(exception)) from exception
+
+    def join(self, frames: list[bytes]) -> bytes:
+        """
+        Join encoded objects into an encoded array by prepending the array header.
+        """
+        if len(frames) < 16:
+            header = bytes((0x90 | len(frames),))
+        elif len(frames) < 0x10000:
+            header = pack('>BH', 0xdc, len(frames))
+        else:
+            header = pack('>BI', 0xdd, len(frames))
+
+        return header + b''.join(frames)
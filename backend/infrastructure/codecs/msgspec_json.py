@@ -0,0 +1,36 @@
+from typing import Any
+
+from msgspec import DecodeError
+from msgspec.json import Decoder, Encoder
+
+from infrastructure.codecs.codec import Codec
+
+
+class MsgspecJSONCodec(Codec):
+    """
+    The JSON codec built on msgspec that works with bytes natively.
+    """
+
+    name = 'msgspec'
+
+    def __init__(self) -> None:
+        """
+        Initialize the codec with a reusable encoder and decoder.
+        """
+        self.encoder = Encoder()
+        self.decoder = Decoder()
+
+    def encode(self, data: Any) -> bytes:
+        """
+        Encode the data straight to bytes.
+        """
+        return self.encoder.encode(data)
+
+    def decode(self, data: bytes | str) -> Any:
+        """
+        Decode the data, raising ValueError instead of the msgspec decoding error.
+        """
+        try:
+            return self.decoder.decode(data)
+        except DecodeError as exception:
+            raise ValueError(str(exception)) from exception
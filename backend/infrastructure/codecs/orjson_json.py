@@ -0,0 +1,25 @@
+from typing import Any
+
+from orjson import dumps, loads
+
+from infrastructure.codecs.codec import Codec
+
+
+class OrjsonCodec(Codec):
+    """
+    The JSON codec built on orjson that works with bytes natively.
+    """
+
+    name = 'orjson'
+
+    def encode(self, data: Any) -> bytes:
+        """
+        Dump the data straight to bytes.
+        """
+        return dumps(data)
+
+    def decode(self, data: bytes | str) -> Any:
+        """
+        Load the data. The orjson decoding error is a ValueError already.
+        """
+        return loads(data)
@@ -0,0 +1,26 @@
+from json import dumps, loads
+from typing import Any
+
+from infrastructure.codecs.codec import Codec
+
+
+class StdlibJSONCodec(Codec):
+    """
+    The JSON codec built on the standard library.
+
+    The separators match the ones starlette uses for websocket frames.
+    """
+
+    name = 'stdlib'
+
+    def encode(self, data: Any) -> bytes:
+        """
+        Dump the data and encode it with UTF-8.
+        """
+        return dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    def decode(self, data: bytes | str) -> Any:
+        """
+        Load the data, the encoding of bytes is detected by the standard library.
+        """
+        return loads(data)
@@ -6,13 +6,17 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from settings import settings
 
+from application.ports import ConnectionPassManagerPort
 from infrastructure.dependency_injector import DependenciesContainer
 from infrastructure.exceptions import AuthenticationException
-from infrastructure.redis import RedisManager
 from infrastructure.security import JWTManager
 
 
-async def retrieve_user_id(credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer())) -> int | None:
+@inject
+async def retrieve_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
+    jwt_manager: JWTManager = Depends(Provide[DependenciesContainer.jwt_manager]),
+) -> int | None:
     """
     Retrieve the requesting user_id from authorization header.
 
@@ -29,7 +33,7 @@ async def retrieve_user_id(credentials: HTTPAuthorizationCredentials = Depends(H
         )
     
     try:
-        return await JWTManager().retrieve_user_id(token=access_token)
+        return await jwt_manager.retrieve_user_id(token=access_token)
     except AuthenticationException as exception:
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED,
@@ -39,7 +43,7 @@ async def retrieve_user_id(credentials: HTTPAuthorizationCredentials = Depends(H
 @inject
 async def retrieve_user_id_from_pass(
     websocket: WebSocket,
-    redis_manager: RedisManager = Depends(Provide[DependenciesContainer.redis_manager]),
+    connection_pass_manager: ConnectionPassManagerPort = Depends(Provide[DependenciesContainer.connection_pass_manager]),
 ) -> int | None:
     """
     Retrieve the requesting user_id from a custom connection pass.
@@ -51,7 +55,7 @@ async def retrieve_user_id_from_pass(
         HTTPException: If the credentials are missing or invalid.
     """
     if (connection_pass := websocket.query_params.get('connection_pass')) is not None:
-        if (user_id := await redis_manager.retrieve_user_id_from_pass(connection_pass=connection_pass)) is not None:
-            return int(user_id)
+        if (user_id := await connection_pass_manager.redeem_pass(connection_pass=connection_pass)) is not None:
+            return user_id
 
     raise WebSocketException(code=settings.standard_unauthenticated_code)
@@ -1,10 +1,15 @@
 from dependency_injector.containers import DeclarativeContainer
-from dependency_injector.providers import Object, Singleton
+from dependency_injector.providers import Dict, Object, Selector, Singleton
 
+from settings import settings
+
+from infrastructure.codecs import CBORCodec, MsgpackCodec, MsgspecJSONCodec, OrjsonCodec, StdlibJSONCodec
+from infrastructure.inbound import RateLimiters
+from infrastructure.loopback import CallbackPersistenceSink, FilePersistenceSink, LoopbackBroker
 from infrastructure.rabbitmq import RabbitMQManager
 from infrastructure.redis import RedisManager
-from infrastructure.security import ConnectionPassManager
-from infrastructure.websocket_hub import WebSocketHub
+from infrastructure.security import ConnectionPassManager, JWTManager, SignedConnectionPassManager
+from infrastructure.websocket_hub import DeliveryReceipts, WebSocketHub
 
 
 class DependenciesContainer(DeclarativeContainer):
@@ -12,26 +17,91 @@ class DependenciesContainer(DeclarativeContainer):
     The main dependency container of the infrastructure layer.
 
     It defines and manages singletons for the infrastructure-level components:
-    RabbitMQ connection, Redis connection, WebSocket hub, and connection pass manager.
+    message codec, RabbitMQ connection or loopback broker, Redis connection, delivery receipts,
+    WebSocket hub, rate limiters, JWT manager and connection pass manager.
     """
 
     process_id = Object(None)
 
-    rabbitmq_manager = Singleton(RabbitMQManager, process_id=process_id)
+    codec = Selector(
+        Object(settings.json_codec),
+        stdlib=Singleton(StdlibJSONCodec),
+        orjson=Singleton(OrjsonCodec),
+        msgspec=Singleton(MsgspecJSONCodec),
+    )
+    """
+    Encodes and decodes the transported messages with the codec selected in the settings.
+    """
+
+    persistence_sink = Selector(
+        Object(settings.loopback_persistence),
+        file=Singleton(FilePersistenceSink, path=settings.loopback_persistence_path),
+        callback=Singleton(CallbackPersistenceSink, callback_path=settings.loopback_persistence_callback),
+    )
+    """
+    Persists the messages of the loopback broker instead of the storage service.
+    """
+
+    rabbitmq_manager = Selector(
+        Object(settings.broker),
+        rabbitmq=Singleton(RabbitMQManager, process_id=process_id, codec=codec),
+        loopback=Singleton(LoopbackBroker, process_id=process_id, codec=codec, sink=persistence_sink),
+    )
     """
-    Manages RabbitMQ connections and publishing/consumption channels.
+    Manages RabbitMQ connections and publishing/consumption channels,
+    or dispatches the messages in process with the loopback broker selected in the settings.
     """
 
     redis_manager = Singleton(RedisManager, process_id=process_id)
     """
     Handles operations with Redis.
     """
-    websocket_hub = Singleton(WebSocketHub)
+
+    delivery_receipts = Singleton(
+        DeliveryReceipts,
+        send=rabbitmq_manager.provided.send_receipts,
+        batch_size=settings.delivery_receipts_batch_size,
+        flush_interval=settings.delivery_receipts_flush_interval,
+        recent_size=settings.delivery_receipts_recent_size,
+    )
+    """
+    Collects the receipts of delivered messages and sends them in batches.
+    """
+
+    subprotocol_codecs = Dict(
+        msgpack=Singleton(MsgpackCodec),
+        cbor=Singleton(CBORCodec),
+    )
+    """
+    Encode and decode the frames of the sockets that negotiated a binary subprotocol.
+    """
+
+    websocket_hub = Singleton(
+        WebSocketHub,
+        codec=codec,
+        delivery_receipts=delivery_receipts,
+        subprotocol_codecs=subprotocol_codecs,
+    )
     """
     Tracks active WebSocket connections and their user bindings.
     """
 
-    connection_pass_manager = Singleton(ConnectionPassManager)
+    rate_limiters = Singleton(RateLimiters)
+    """
+    Keeps the rate limits of the inbound frames of the connections and users.
+    """
+
+    jwt_manager = Singleton(JWTManager)
+    """
+    Verifies access tokens and caches the user ids of the verified ones.
+    """
+
+    connection_pass_manager = Selector(
+        Object(settings.connection_pass_mode),
+        redis=Singleton(ConnectionPassManager, redis_manager=redis_manager),
+        signed=Singleton(SignedConnectionPassManager),
+    )
     """
-    Issues temporary connection passes for WebSocket authentication.
+    Issues and redeems temporary connection passes for WebSocket authentication,
+    either stored in Redis or signed and verified locally.
     """
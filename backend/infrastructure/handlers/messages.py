@@ -1,14 +1,20 @@
+from functools import partial
+
 from dependency_injector.wiring import inject, Provide
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
 from pydantic import ValidationError
 
+from settings import settings
+
+from application.ports import ConnectionPassManagerPort
 from application.use_cases import ConnectUserUseCase, DisconnectUserUseCase
 from infrastructure.dependencies import retrieve_user_id, retrieve_user_id_from_pass
 from infrastructure.dependency_injector import DependenciesContainer
+from infrastructure.inbound import AckWindow, InboundMessagePipeline, RateLimiter, RateLimiters
 from infrastructure.incoming_dtos import IncomingMessageDTO
+from infrastructure.monitoring import inbound_frames_rejected, inbound_rate_limit_disconnects
 from infrastructure.rabbitmq import RabbitMQManager
 from infrastructure.redis import RedisManager
-from infrastructure.security import ConnectionPassManager
 from infrastructure.websocket_hub import WebSocketHub
 from interface_adapters.outgoing_dtos import OutgoingConnectionPassDTO
 from interface_adapters.controllers import IssueConnectionPassController, SendMessageController
@@ -23,16 +29,21 @@ async def send_message(
     user_id: int = Depends(retrieve_user_id_from_pass),
     websocket_hub: WebSocketHub = Depends(Provide[DependenciesContainer.websocket_hub]),
     rabbitmq_manager: RabbitMQManager = Depends(Provide[DependenciesContainer.rabbitmq_manager]),
-    redis_manager: RedisManager = Depends(Provide[DependenciesContainer.redis_manager])
+    redis_manager: RedisManager = Depends(Provide[DependenciesContainer.redis_manager]),
+    rate_limiters: RateLimiters = Depends(Provide[DependenciesContainer.rate_limiters]),
 ) -> None:
     """
      Process websocket connections.
 
     - Connect user.
     - Receive messages.
-    - Send messages to broker.
+    - Check messages against the rate limits if those are enabled.
+    - Send messages to broker, through the fast path if it is enabled.
+    - Answer messages with acks or errors in order as the broker confirms them if those are enabled.
     - Disconnect user.
     """
+    rate_limiter = None
+    ack_window = None
 
     try:
         await ConnectUserUseCase(
@@ -42,17 +53,83 @@ async def send_message(
             redis_manager=redis_manager,
         ).execute()
 
+        inbound_pipeline = None
+
+        if settings.inbound_acks:
+            ack_window = AckWindow(
+                size=settings.inbound_ack_window,
+                reply=partial(websocket_hub.reply, user_id, websocket),
+            )
+            ack_window.start()
+
+        if settings.inbound_fast_path:
+            inbound_pipeline = InboundMessagePipeline(
+                sender_id=user_id,
+                rabbitmq_manager=rabbitmq_manager,
+                ack_window=ack_window,
+                codec=websocket_hub.subprotocol_codec(websocket=websocket),
+            )
+
+        if settings.rate_limiting:
+            rate_limiter = rate_limiters.acquire(user_id=user_id)
+
         while True:
-            if (message_data := await websocket_hub.receive(websocket=websocket)) is not None:
+            if inbound_pipeline is not None:
+                frame = await websocket_hub.receive_frame(websocket=websocket)
+
+                if rate_limiter is not None and (error := await admit(websocket=websocket, rate_limiter=rate_limiter)):
+                    await send_error(
+                        websocket=websocket,
+                        websocket_hub=websocket_hub,
+                        ack_window=ack_window,
+                        error=error,
+                        frame=frame,
+                    )
+                    continue
+
+                try:
+                    await inbound_pipeline.process(frame=frame)
+                except ValidationError as exception:
+                    error = {
+                        'title': 'Data consistency error.',
+                        'details': exception.errors(include_url=False, include_input=False),
+                    }
+                    await send_error(
+                        websocket=websocket,
+                        websocket_hub=websocket_hub,
+                        ack_window=ack_window,
+                        error=error,
+                        frame=frame,
+                    )
+
+            elif (message_data := await websocket_hub.receive(
+                websocket=websocket,
+                on_error=partial(send_error, websocket=websocket, websocket_hub=websocket_hub, ack_window=ack_window),
+            )) is not None:
+
+                if rate_limiter is not None and (error := await admit(websocket=websocket, rate_limiter=rate_limiter)):
+                    await send_error(
+                        websocket=websocket,
+                        websocket_hub=websocket_hub,
+                        ack_window=ack_window,
+                        error=error,
+                        frame=message_data,
+                    )
+                    continue
 
                 try:
                     incoming_message = IncomingMessageDTO(**message_data).model_dump()
                 except ValidationError as exception:
-                    await websocket.send_json(
-                        {
-                            'title': 'Data consistency error.',
-                            'details': exception.errors(),
-                        }
+                    error = {
+                        'title': 'Data consistency error.',
+                        'details': exception.errors(),
+                    }
+                    await send_error(
+                        websocket=websocket,
+                        websocket_hub=websocket_hub,
+                        ack_window=ack_window,
+                        error=error,
+                        frame=message_data,
                     )
                 else:
 
@@ -62,7 +139,10 @@ async def send_message(
                         rabbitmq_manager=rabbitmq_manager,
                     )
 
-                    await controller.send_message()
+                    future = await controller.send_message()
+
+                    if ack_window is not None:
+                        await ack_window.submit(client_message_id=incoming_message['client_message_id'], future=future)
     except WebSocketDisconnect:
         use_case = DisconnectUserUseCase(
             user_id=user_id,
@@ -71,13 +151,107 @@ async def send_message(
             redis_manager=redis_manager,
         )
         await use_case.execute()
+    finally:
+        if rate_limiter is not None:
+            rate_limiters.release(rate_limiter=rate_limiter)
+        if ack_window is not None:
+            ack_window.close()
+
+async def send_error(
+    websocket: WebSocket,
+    websocket_hub: WebSocketHub,
+    ack_window: AckWindow | None,
+    error: dict,
+    frame: str | bytes | dict | None = None,
+) -> None:
+    """
+    Answer a frame with an error.
+
+    With the acks enabled the error goes through the ack window, so that it is keyed by
+    the client_message_id of the frame and queued in order with the acks of the frames
+    received before it. Otherwise it is written to the socket right away.
+
+    Args:
+        websocket (WebSocket): An instance of FastAPI WebSocket.
+        websocket_hub (WebSocketHub): The hub that writes the error.
+        ack_window (AckWindow | None): The ack window of the connection if the acks are enabled.
+        error (dict): The title and the details of the error.
+        frame (str | bytes | dict | None): The frame, raw or decoded, if it was received whole.
+    """
+    if ack_window is None:
+        await websocket_hub.send_frame(websocket=websocket, message_data=error)
+        return
+
+    client_message_id = None
+
+    if frame is not None:
+        client_message_id = read_client_message_id(websocket=websocket, websocket_hub=websocket_hub, frame=frame)
+
+    await ack_window.reject(client_message_id=client_message_id, error=error)
+
+def read_client_message_id(websocket: WebSocket, websocket_hub: WebSocketHub, frame: str | bytes | dict) -> str | None:
+    """
+    Read the client_message_id of a frame that is not a valid message, so that its error can be matched.
+
+    Args:
+        websocket (WebSocket): An instance of FastAPI WebSocket the frame was received from.
+        websocket_hub (WebSocketHub): The hub whose codecs decode the frame.
+        frame (str | bytes | dict): The raw data of a websocket frame or the decoded one.
+
+    Returns:
+        str | None: The client_message_id if the frame is an object with a string one.
+    """
+    codec = websocket_hub.subprotocol_codec(websocket=websocket) or websocket_hub.codec
+
+    if isinstance(frame, dict):
+        message_data = frame
+    else:
+        try:
+            message_data = codec.decode(frame)
+        except ValueError:
+            return None
+
+    if isinstance(message_data, dict) and isinstance(client_message_id := message_data.get('client_message_id'), str):
+        return client_message_id
+    return None
+
+async def admit(websocket: WebSocket, rate_limiter: RateLimiter) -> dict | None:
+    """
+    Check a frame against the rate limits of the connection.
+
+    A rejected frame is to be answered with a slow down error. A connection that keeps
+    exceeding the limits is closed.
+
+    Args:
+        websocket (WebSocket): An instance of FastAPI WebSocket.
+        rate_limiter (RateLimiter): The rate limiter of the connection.
+
+    Returns:
+        dict | None: The slow down error if the frame was rejected, None if it should be processed.
+
+    Raises:
+        WebSocketDisconnect: Raisen if the connection was closed for exceeding the limits.
+    """
+    if rate_limiter.admit():
+        return None
+
+    inbound_frames_rejected.add(amount=1, attributes={'limit': rate_limiter.rejected_by})
+
+    if rate_limiter.offending:
+        inbound_rate_limit_disconnects.add(amount=1)
+        await websocket.close(code=settings.rate_limit_close_code)
+        raise WebSocketDisconnect(code=settings.rate_limit_close_code)
+
+    return {
+        'title': 'Slow down.',
+        'details': {'retry_after': round(rate_limiter.retry_after(), 3)},
+    }
 
 @messages_router.post('/get-connection-pass')
 @inject
 async def get_connection_pass(
     user_id: int = Depends(retrieve_user_id),
-    connection_pass_manager: ConnectionPassManager = Depends(Provide[DependenciesContainer.connection_pass_manager]),
-    redis_manager: RedisManager = Depends(Provide[DependenciesContainer.redis_manager]),
+    connection_pass_manager: ConnectionPassManagerPort = Depends(Provide[DependenciesContainer.connection_pass_manager]),
 ) -> OutgoingConnectionPassDTO:
     """
     Issues a one time connection pass to connect to the websocket endpoint.
@@ -89,7 +263,6 @@ async def get_connection_pass(
     controller = IssueConnectionPassController(
         user_id=user_id,
         connection_pass_manager=connection_pass_manager,
-        redis_manager=redis_manager,
     )
 
     return await controller.issue_connection_pass()
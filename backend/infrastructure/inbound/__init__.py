@@ -0,0 +1,5 @@
+from infrastructure.inbound.ack_window import AckWindow
+from infrastructure.inbound.message_pipeline import InboundMessagePipeline
+from infrastructure.inbound.rate_limiter import RateLimiter
+from infrastructure.inbound.rate_limiters import RateLimiters
+from infrastructure.inbound.token_bucket import TokenBucket
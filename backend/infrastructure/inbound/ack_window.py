@@ -0,0 +1,94 @@
+from asyncio import create_task, Event, Future, Semaphore, shield, Task
+from collections import deque
+from collections.abc import Callable
+
+
+class AckWindow:
+    """
+    The window of the inbound messages of a connection waiting for their broker confirms.
+
+    Up to the size of the window messages of a connection are published at once, the
+    next frame is not received until a slot is free. Every message is answered with an
+    ack or an error frame keyed by its client_message_id. The answers are sent in the
+    order the frames were received, a message is answered only after every message
+    received before it.
+    """
+
+    def __init__(self, size: int, reply: Callable[[dict], None]) -> None:
+        """
+        Initialize the window.
+
+        Args:
+            size (int): The maximum amount of messages waiting for their confirms.
+            reply (Callable): Queues an answer frame for the socket of the connection.
+        """
+        self.slots = Semaphore(size)
+        self.reply = reply
+        self.pending: deque[tuple[str | None, Future | None, dict | None]] = deque()
+        self.submitted = Event()
+        self.reporter: Task | None = None
+
+    def start(self) -> None:
+        """
+        Start answering the messages.
+        """
+        self.reporter = create_task(self.report())
+
+    async def submit(self, client_message_id: str, future: Future) -> None:
+        """
+        Add a published message to the window, waiting for a free slot.
+
+        Args:
+            client_message_id (str): The id the client assigned to the message.
+            future (Future): The future that is resolved once the broker has confirmed the message.
+        """
+        await self.slots.acquire()
+
+        self.pending.append((client_message_id, future, None))
+        self.submitted.set()
+
+    async def reject(self, client_message_id: str | None, error: dict) -> None:
+        """
+        Add a frame that was not published to the window, so that its error is sent in order.
+
+        Args:
+            client_message_id (str | None): The id the client assigned to the message if it is known.
+            error (dict): The title and the details of the error.
+        """
+        await self.slots.acquire()
+
+        self.pending.append((client_message_id, None, error))
+        self.submitted.set()
+
+    async def report(self) -> None:
+        """
+        Answer the messages in order as their confirms arrive.
+        """
+        while True:
+            if not self.pending:
+                self.submitted.clear()
+                await self.submitted.wait()
+                continue
+
+            client_message_id, future, error = self.pending[0]
+
+            if future is not None:
+                try:
+                    await shield(future)
+                except Exception:
+                    error = {'title': 'Message was not sent.'}
+
+            self.pending.popleft()
+            self.slots.release()
+
+            if error is None:
+                self.reply({'type': 'ack', 'client_message_id': client_message_id})
+            else:
+                self.reply({'type': 'error', 'client_message_id': client_message_id} | error)
+
+    def close(self) -> None:
+        """
+        Stop answering the messages.
+        """
+        if self.reporter is not None:
+            self.reporter.cancel()
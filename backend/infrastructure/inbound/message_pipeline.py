@@ -0,0 +1,104 @@
+from asyncio import Future
+
+from pydantic import ValidationError
+from pydantic_core import PydanticCustomError
+
+from application.ports import RabbitMQManagerPort
+from domain.entities import Message
+from infrastructure.codecs import Codec
+from infrastructure.inbound.ack_window import AckWindow
+from infrastructure.incoming_dtos import IncomingMessageDTO
+
+
+class InboundMessagePipeline:
+    """
+    The fast path from a raw websocket frame to the broker.
+
+    A frame is decoded and validated by a single pydantic call straight from its JSON,
+    the Message entity is composed from the validated DTO and handed to the broker port,
+    which serializes it in one pass. One pipeline serves every frame of a connection.
+    With an ack window the published messages are handed to it to be answered.
+    The frames of a binary subprotocol are decoded with its codec and validated from
+    the decoded data instead.
+    """
+
+    def __init__(
+        self,
+        sender_id: int,
+        rabbitmq_manager: RabbitMQManagerPort,
+        ack_window: AckWindow | None = None,
+        codec: Codec | None = None,
+    ) -> None:
+        """
+        Initialize the pipeline.
+
+        Args:
+            sender_id (int): The id of the user the connection belongs to.
+            rabbitmq_manager (RabbitMQManagerPort): The port for RabbitMQ.
+            ack_window (AckWindow | None): The window of the messages waiting for their confirms.
+            codec (Codec | None): The codec of the negotiated binary subprotocol, None for JSON.
+        """
+        self.sender_id = sender_id
+        self.rabbitmq_manager = rabbitmq_manager
+        self.ack_window = ack_window
+        self.codec = codec
+
+    async def process(self, frame: str | bytes) -> Future:
+        """
+        Validate a frame and send the message to the broker.
+
+        Args:
+            frame (str | bytes): The raw data of a websocket frame.
+
+        Returns:
+            Future: The future that is resolved once the broker has accepted the message.
+
+        Raises:
+            ValidationError: Raisen if the frame can not be decoded or is not a valid message.
+        """
+        if self.codec is None:
+            incoming_message = IncomingMessageDTO.model_validate_json(frame)
+        else:
+            incoming_message = IncomingMessageDTO.model_validate(self.decode(frame=frame))
+
+        message = Message.compose(
+            client_message_id=incoming_message.client_message_id,
+            chat_id=incoming_message.chat_id,
+            sender_id=self.sender_id,
+            recipient_id=incoming_message.recipient_id,
+            body=incoming_message.body,
+        )
+
+        future = await self.rabbitmq_manager.send_message(message=message)
+
+        if self.ack_window is not None:
+            await self.ack_window.submit(client_message_id=message.client_message_id, future=future)
+
+        return future
+
+    def decode(self, frame: str | bytes) -> object:
+        """
+        Decode a frame of a binary subprotocol.
+
+        Args:
+            frame (str | bytes): The raw data of a websocket frame.
+
+        Returns:
+            object: The decoded data.
+
+        Raises:
+            ValidationError: Raisen if the frame can not be decoded, just as for an invalid JSON.
+        """
+        try:
+            return self.codec.decode(frame)
+        except ValueError as exception:
+            raise ValidationError.from_exception_data(
+                title=IncomingMessageDTO.__name__,
+                line_errors=[
+                    {
+                        'type': PydanticCustomError('frame_invalid', 'Invalid frame: {error}', {'error': str(exception)}),
+                        'loc': (),
+                        'input': None,
+                    }
+                ],
+            ) from exception
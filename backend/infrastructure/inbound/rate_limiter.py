@@ -0,0 +1,91 @@
+from time import monotonic
+
+from infrastructure.inbound.token_bucket import TokenBucket
+
+
+class RateLimiter:
+    """
+    The rate limits of the inbound frames of a connection.
+
+    A frame takes a token from the bucket of the connection and from the bucket of its
+    user that is shared by every connection of the user. Every rejected frame takes a
+    token from the strikes bucket, a connection that runs out of strikes keeps ignoring
+    the limits and is considered offending.
+    """
+
+    __slots__ = ('user_id', 'connection_bucket', 'user_bucket', 'strikes_bucket', 'rejected_by')
+
+    def __init__(
+        self,
+        user_id: int,
+        connection_bucket: TokenBucket,
+        user_bucket: TokenBucket,
+        strikes_bucket: TokenBucket,
+    ) -> None:
+        """
+        Initialize the limiter.
+
+        Args:
+            user_id (int): The id of the user the connection belongs to.
+            connection_bucket (TokenBucket): The bucket of the connection.
+            user_bucket (TokenBucket): The bucket shared by the connections of the user.
+            strikes_bucket (TokenBucket): The bucket of the rejections tolerated.
+        """
+        self.user_id = user_id
+        self.connection_bucket = connection_bucket
+        self.user_bucket = user_bucket
+        self.strikes_bucket = strikes_bucket
+        self.rejected_by: str | None = None
+
+    def admit(self) -> bool:
+        """
+        Check a frame against the limits, taking a token from both buckets if it is allowed.
+
+        Returns:
+            bool: Whether the frame is allowed.
+        """
+        now = monotonic()
+
+        if self.connection_bucket.refill(now=now) < 1:
+            return self.reject(limit='connection', now=now)
+        if self.user_bucket.refill(now=now) < 1:
+            return self.reject(limit='user', now=now)
+
+        self.connection_bucket.tokens -= 1
+        self.user_bucket.tokens -= 1
+
+        return True
+
+    def reject(self, limit: str, now: float) -> bool:
+        """
+        Record a rejected frame.
+
+        Args:
+            limit (str): The limit the frame exceeded.
+            now (float): The current monotonic time.
+
+        Returns:
+            bool: Always False.
+        """
+        self.rejected_by = limit
+
+        if self.strikes_bucket.refill(now=now) >= 1:
+            self.strikes_bucket.tokens -= 1
+
+        return False
+
+    @property
+    def offending(self) -> bool:
+        """
+        Whether the connection has run out of strikes.
+        """
+        return self.strikes_bucket.tokens < 1
+
+    def retry_after(self) -> float:
+        """
+        Get the time until the next frame is allowed.
+
+        Returns:
+            float: The time in seconds.
+        """
+        return max(self.connection_bucket.retry_after(), self.user_bucket.retry_after())
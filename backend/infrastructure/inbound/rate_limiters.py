@@ -0,0 +1,70 @@
+from time import monotonic
+
+from settings import settings
+
+from infrastructure.inbound.rate_limiter import RateLimiter
+from infrastructure.inbound.token_bucket import TokenBucket
+
+
+class RateLimiters:
+    """
+    The registry of the rate limiters of the connections.
+
+    The bucket of a user is shared by every connection of the user and kept only while
+    the user has connections.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize the registry.
+        """
+        self.user_buckets: dict[int, TokenBucket] = {}
+        self.user_connections: dict[int, int] = {}
+
+    def acquire(self, user_id: int) -> RateLimiter:
+        """
+        Create the rate limiter of a new connection.
+
+        Args:
+            user_id (int): The id of the user the connection belongs to.
+
+        Returns:
+            RateLimiter: The limiter of the connection.
+        """
+        now = monotonic()
+
+        if (user_bucket := self.user_buckets.get(user_id)) is None:
+            user_bucket = TokenBucket(rate=settings.user_rate_limit, capacity=settings.user_rate_burst, now=now)
+            self.user_buckets[user_id] = user_bucket
+
+        self.user_connections[user_id] = self.user_connections.get(user_id, 0) + 1
+
+        return RateLimiter(
+            user_id=user_id,
+            connection_bucket=TokenBucket(
+                rate=settings.connection_rate_limit,
+                capacity=settings.connection_rate_burst,
+                now=now,
+            ),
+            user_bucket=user_bucket,
+            strikes_bucket=TokenBucket(
+                rate=settings.rate_limit_strikes_refill,
+                capacity=settings.rate_limit_strikes,
+                now=now,
+            ),
+        )
+
+    def release(self, rate_limiter: RateLimiter) -> None:
+        """
+        Forget the rate limiter of a closed connection.
+
+        Args:
+            rate_limiter (RateLimiter): The limiter of the connection.
+        """
+        user_id = rate_limiter.user_id
+
+        if (connections := self.user_connections.get(user_id, 0) - 1) > 0:
+            self.user_connections[user_id] = connections
+        else:
+            self.user_connections.pop(user_id, None)
+            self.user_buckets.pop(user_id, None)
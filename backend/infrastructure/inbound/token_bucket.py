@@ -0,0 +1,48 @@
+class TokenBucket:
+    """
+    The token bucket that limits the rate of events.
+
+    The bucket holds up to its capacity of tokens and is refilled continuously at its
+    rate. An event is allowed if a whole token is available. The bucket is refilled
+    lazily upon every check, so an idle bucket costs nothing.
+    """
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated_at')
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate (float): The amount of tokens added per second.
+            capacity (float): The maximum amount of tokens, the allowed burst.
+            now (float): The current monotonic time.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def refill(self, now: float) -> float:
+        """
+        Add the tokens accumulated since the last check.
+
+        Args:
+            now (float): The current monotonic time.
+
+        Returns:
+            float: The amount of tokens available.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+        return self.tokens
+
+    def retry_after(self) -> float:
+        """
+        Get the time until a whole token is available.
+
+        Returns:
+            float: The time in seconds.
+        """
+        return max(0.0, (1 - self.tokens) / self.rate)
@@ -0,0 +1,4 @@
+from infrastructure.loopback.callback_persistence_sink import CallbackPersistenceSink
+from infrastructure.loopback.file_persistence_sink import FilePersistenceSink
+from infrastructure.loopback.loopback_broker import LoopbackBroker
+from infrastructure.loopback.persistence_sink import PersistenceSink
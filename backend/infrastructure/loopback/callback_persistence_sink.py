@@ -0,0 +1,41 @@
+from collections.abc import Awaitable, Callable
+from importlib import import_module
+from inspect import isawaitable
+
+from infrastructure.loopback.persistence_sink import PersistenceSink
+
+
+class CallbackPersistenceSink(PersistenceSink):
+    """
+    The sink that hands the messages to a callback of the deployment.
+
+    The callback is given by its import path, e.g. ``storage.sinks:save_messages``, gets
+    the list of encoded messages and may be either a function or a coroutine function.
+    """
+
+    def __init__(self, callback_path: str) -> None:
+        """
+        Initialize the sink.
+
+        Args:
+            callback_path (str): The import path of the callback in the module:name form.
+
+        Raises:
+            ValueError: Raisen if the path is not in the module:name form.
+        """
+        module_name, separator, name = callback_path.partition(':')
+
+        if not separator:
+            raise ValueError(f'The persistence callback {callback_path} is not in the module:name form.')
+
+        self.callback: Callable[[list[bytes]], Awaitable | None] = getattr(import_module(module_name), name)
+
+    async def persist(self, bodies: list[bytes]) -> None:
+        """
+        Call the callback with a batch of encoded messages.
+
+        Args:
+            bodies (list): The encoded messages.
+        """
+        if isawaitable(result := self.callback(bodies)):
+            await result
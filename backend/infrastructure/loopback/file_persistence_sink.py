@@ -0,0 +1,46 @@
+from asyncio import to_thread
+from pathlib import Path
+
+from infrastructure.loopback.persistence_sink import PersistenceSink
+
+
+class FilePersistenceSink(PersistenceSink):
+    """
+    The sink that appends the messages to a file, one encoded message per line.
+
+    The file is written from a thread, so a slow disk never blocks the event loop.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the sink.
+
+        Args:
+            path (str): The path of the file, it is created if it does not exist.
+        """
+        self.file = Path(path).open('ab')
+
+    async def persist(self, bodies: list[bytes]) -> None:
+        """
+        Append a batch of encoded messages to the file and flush it.
+
+        Args:
+            bodies (list): The encoded messages.
+        """
+        await to_thread(self.write, b''.join(body + b'\n' for body in bodies))
+
+    def write(self, data: bytes) -> None:
+        """
+        Write and flush the data.
+
+        Args:
+            data (bytes): The lines of a batch.
+        """
+        self.file.write(data)
+        self.file.flush()
+
+    async def close(self) -> None:
+        """
+        Close the file.
+        """
+        self.file.close()
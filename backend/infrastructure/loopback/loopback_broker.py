@@ -0,0 +1,202 @@
+from asyncio import Event, Future, get_running_loop, QueueFull, sleep
+from logging import getLogger
+from time import time_ns
+
+from settings import settings
+
+from application.ports import RabbitMQManagerPort
+from domain.entities import Message
+from domain.value_objects import MessageStatus
+from infrastructure.batching import Batcher
+from infrastructure.codecs import Codec, MessageSerializer
+from infrastructure.loopback.persistence_sink import PersistenceSink
+from infrastructure.transport import Delivery, message_queue
+
+
+class LoopbackBroker(RabbitMQManagerPort):
+    """
+    The in-process broker for single-node deployments that run without RabbitMQ.
+
+    A sent message is given its id right away and dispatched straight to the sockets of
+    its sender and recipient connected to this process, skipping both broker hops. The
+    storage service is replaced by the persistence sink: the messages and the delivery
+    receipts are handed to it in batches and the confirm of a message is resolved once
+    its batch is persisted, so the inbound acks keep their meaning.
+
+    The messages only reach the users connected to the same process, so the loopback
+    broker is meant for a single worker.
+    """
+
+    def __init__(self, process_id: str, codec: Codec, sink: PersistenceSink) -> None:
+        """
+        Initialize the broker.
+
+        Args:
+            process_id (str): A string that identifies the process where an instance of this broker currently runs.
+            codec (Codec): The codec the messages are encoded with.
+            sink (PersistenceSink): The sink the messages are persisted to.
+        """
+        self.process_id = process_id
+        self.codec = codec
+        self.sink = sink
+        self.serializer = MessageSerializer(codec=codec, omit_defaults=settings.omit_default_message_fields)
+        self.last_message_id = 0
+        self.batch: list[tuple[bytes, Future]] = []
+        self.batcher = Batcher(
+            flush=self.flush,
+            batch_size=settings.loopback_persistence_batch_size,
+            flush_interval=settings.loopback_persistence_flush_interval,
+        )
+        self.logger = getLogger(settings.messages_logger_name)
+
+    async def start(self) -> None:
+        """
+        Start persisting the messages.
+        """
+        if settings.launcher_workers_count > 1:
+            self.logger.warning(
+                'Loopback broker with several workers.',
+                extra={'user_id': None, 'event_type': 'Messages only reach the users of the same worker.'},
+            )
+
+        self.batcher.start()
+
+    async def consume(self) -> None:
+        """
+        Nothing to consume, the messages are dispatched as they are sent.
+        """
+        await Event().wait()
+
+    def next_message_id(self) -> int:
+        """
+        Give out the id of a message.
+
+        The ids are the microseconds since the epoch, bumped should several messages share
+        one, so they grow across restarts without reading the persisted messages back.
+
+        Returns:
+            int: The id of the message.
+        """
+        self.last_message_id = max(self.last_message_id + 1, time_ns() // 1000)
+        return self.last_message_id
+
+    async def send_message(self, message: Message) -> Future:
+        """
+        Dispatch a message to the sockets and submit it for persistence.
+
+        The sender waits only while the dispatch queue is above the watermarks.
+
+        Args:
+            message (Message): The message entity.
+
+        Returns:
+            Future: The future that is resolved once the message has been persisted.
+        """
+        message.id = self.next_message_id()
+        body = self.serializer.serialize(message=message)
+
+        delivery = Delivery(
+            message_data=None,
+            user_ids={message.sender_id, message.recipient_id},
+            recipient_id=message.recipient_id,
+            message_id=message.id if settings.delivery_receipts else None,
+        )
+        delivery.payload = body.decode('utf-8')
+
+        await self.dispatch(delivery=delivery)
+
+        return self.submit(body=body)
+
+    async def dispatch(self, delivery: Delivery) -> None:
+        """
+        Put a delivery on the dispatch queue, waiting while the queue is above the watermarks.
+
+        Args:
+            delivery (Delivery): The delivery of a message.
+        """
+        while True:
+            await message_queue.wait_until_accepting()
+
+            try:
+                message_queue.put_nowait(delivery)
+            except QueueFull:
+                await sleep(settings.loopback_dispatch_retry_interval)
+            else:
+                break
+
+        delivery.release()
+
+    async def send_receipts(self, receipts: list) -> Future:
+        """
+        Submit a batch of delivery receipts for persistence.
+
+        Args:
+            receipts (list): The [message_id, delivered_at] pairs of the delivered messages.
+
+        Returns:
+            Future: The future that is resolved once the batch has been persisted.
+        """
+        return self.submit(body=self.codec.encode({'status': MessageStatus.DELIVERED.value, 'receipts': receipts}))
+
+    def submit(self, body: bytes) -> Future:
+        """
+        Add an encoded message to the current batch of the sink.
+
+        Args:
+            body (bytes): The encoded message.
+
+        Returns:
+            Future: The future that is resolved once the batch has been persisted.
+        """
+        future = get_running_loop().create_future()
+        future.add_done_callback(self.report)
+
+        self.batch.append((body, future))
+        self.batcher.added(size=len(self.batch))
+
+        return future
+
+    async def flush(self) -> None:
+        """
+        Persist the current batch and resolve the futures of its messages.
+        """
+        batch, self.batch = self.batch, []
+        self.batcher.taken()
+
+        if not batch:
+            return
+
+        try:
+            await self.sink.persist(bodies=[body for body, _ in batch])
+        except Exception as exception:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exception)
+        else:
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+
+    def report(self, future: Future) -> None:
+        """
+        Log a message that was not persisted.
+
+        The failure is reported even if the sender does not wait for the future.
+
+        Args:
+            future (Future): The future of a message.
+        """
+        if not future.cancelled() and (exception := future.exception()) is not None:
+            self.logger.error(
+                'Loopback persistence error.',
+                extra={'user_id': None, 'event_type': f'Message was not persisted: {exception}'},
+            )
+
+    async def close(self) -> None:
+        """
+        Stop flushing periodically, persist what is left and close the sink.
+        """
+        self.batcher.stop()
+
+        await self.flush()
+        await self.sink.close()
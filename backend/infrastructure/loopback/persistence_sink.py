@@ -0,0 +1,29 @@
+from abc import ABC, abstractmethod
+
+
+class PersistenceSink(ABC):
+    """
+    The sink the loopback broker hands the messages to instead of the storage service.
+
+    A sink gets the very bodies the storage service would consume from the database
+    exchange: the sent messages and the batches of delivery receipts, in the order they
+    were sent.
+    """
+
+    @abstractmethod
+    async def persist(self, bodies: list[bytes]) -> None:
+        """
+        Persist a batch of encoded messages.
+
+        Args:
+            bodies (list): The encoded messages.
+
+        Raises:
+            Exception: Raisen should the batch not be persisted, the senders are told so.
+        """
+        ...
+
+    async def close(self) -> None:
+        """
+        Release the resources of the sink.
+        """
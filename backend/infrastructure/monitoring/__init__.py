@@ -1,2 +1,21 @@
 from infrastructure.monitoring.main import setup_metrics
-from infrastructure.monitoring.metrics import websocket_hub_active_connections
+from infrastructure.monitoring.metrics import (
+    delivery_receipts_batch_size,
+    delivery_receipts_recorded,
+    dispatch_shard_queue_depth,
+    inbound_frames_rejected,
+    inbound_rate_limit_disconnects,
+    jwt_cache_hits,
+    jwt_cache_misses,
+    rabbitmq_ack_batch_size,
+    rabbitmq_consumer_paused_time,
+    rabbitmq_consumer_pauses,
+    rabbitmq_individual_acks,
+    redis_batch_size,
+    redis_round_trips_saved,
+    websocket_coalesced_frame_size,
+    websocket_hub_active_connections,
+    websocket_outbound_overflows,
+    websocket_outbound_queue_depth,
+    websocket_outbound_send_timeouts,
+)
@@ -12,3 +12,89 @@ websocket_hub_active_connections = meter.create_up_down_counter(
     name='websocket_hub_active_connections',
     description='The amount of active connections to the websocket hub.',
 )
+
+websocket_outbound_queue_depth = meter.create_up_down_counter(
+    name='websocket_outbound_queue_depth',
+    description='The amount of frames waiting in the outbound queues of the connections.',
+)
+
+websocket_outbound_overflows = meter.create_counter(
+    name='websocket_outbound_overflows',
+    description='The amount of frames that did not fit into the outbound queue of a connection.',
+)
+
+websocket_outbound_send_timeouts = meter.create_counter(
+    name='websocket_outbound_send_timeouts',
+    description='The amount of frames dropped because the client did not take them within the send timeout.',
+)
+
+delivery_receipts_recorded = meter.create_counter(
+    name='delivery_receipts_recorded',
+    description='The amount of messages written to a socket of their recipient.',
+)
+
+delivery_receipts_batch_size = meter.create_histogram(
+    name='delivery_receipts_batch_size',
+    description='The amount of delivery receipts sent in a single broker message.',
+)
+
+inbound_frames_rejected = meter.create_counter(
+    name='inbound_frames_rejected',
+    description='The amount of inbound frames rejected by the rate limits.',
+)
+
+inbound_rate_limit_disconnects = meter.create_counter(
+    name='inbound_rate_limit_disconnects',
+    description='The amount of connections closed for repeatedly exceeding the rate limits.',
+)
+
+dispatch_shard_queue_depth = meter.create_up_down_counter(
+    name='dispatch_shard_queue_depth',
+    description='The amount of deliveries waiting in a shard of the dispatch queue.',
+)
+
+rabbitmq_consumer_pauses = meter.create_counter(
+    name='rabbitmq_consumer_pauses',
+    description='The amount of times the RabbitMQ consumer was paused by a dispatch shard above the high watermark.',
+)
+
+rabbitmq_consumer_paused_time = meter.create_counter(
+    name='rabbitmq_consumer_paused_time',
+    description='The time the RabbitMQ consumer spent paused.',
+    unit='s',
+)
+
+rabbitmq_individual_acks = meter.create_counter(
+    name='rabbitmq_individual_acks',
+    description='The amount of consumed messages acknowledged one by one behind an unsettled message.',
+)
+
+rabbitmq_ack_batch_size = meter.create_histogram(
+    name='rabbitmq_ack_batch_size',
+    description='The amount of consumed messages acknowledged by a single cumulative ack.',
+)
+
+redis_batch_size = meter.create_histogram(
+    name='redis_batch_size',
+    description='The amount of Redis commands sent in a single pipelined round trip.',
+)
+
+redis_round_trips_saved = meter.create_counter(
+    name='redis_round_trips_saved',
+    description='The amount of Redis round trips saved by batching the commands.',
+)
+
+websocket_coalesced_frame_size = meter.create_histogram(
+    name='websocket_coalesced_frame_size',
+    description='The amount of messages written to a socket as a single coalesced frame.',
+)
+
+jwt_cache_hits = meter.create_counter(
+    name='jwt_cache_hits',
+    description='The amount of access tokens whose user id was taken from the verified tokens cache.',
+)
+
+jwt_cache_misses = meter.create_counter(
+    name='jwt_cache_misses',
+    description='The amount of access tokens that had to be decoded and verified.',
+)
@@ -1,2 +1,4 @@
+from infrastructure.rabbitmq.ack_tracker import AckTracker
+from infrastructure.rabbitmq.publish_pipeline import PublishPipeline
 from infrastructure.rabbitmq.rabbitmq_decoder import RabbitMQDecoder
 from infrastructure.rabbitmq.rabbitmq_manager import RabbitMQManager
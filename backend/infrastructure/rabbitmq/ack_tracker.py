@@ -0,0 +1,154 @@
+from collections import OrderedDict
+from logging import getLogger
+
+from aio_pika import AMQPException as AioPikaException
+from aio_pika.abc import AbstractIncomingMessage
+from aiormq import AMQPException as AioRMQException
+
+from settings import settings
+
+from infrastructure.batching import Batcher
+from infrastructure.monitoring import rabbitmq_ack_batch_size, rabbitmq_individual_acks
+
+
+class AckTracker:
+    """
+    The tracker that acknowledges the consumed messages once they are settled.
+
+    A message is settled once it is delivered to the websockets, deliberately dropped
+    or rejected. The settled messages are acknowledged periodically with a single
+    cumulative ack of the newest message that has every older message settled as well,
+    so one ack frame covers many deliveries while a message that is still on its way
+    is never acknowledged. The settled messages behind a message still on its way are
+    acknowledged one by one, so a single slow socket never holds the prefetch window
+    of the whole process.
+
+    Delivery tags start over when the channel is reopened. The messages of the previous
+    channel can not be acknowledged anymore and are redelivered by the broker, so they
+    are forgotten.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float) -> None:
+        """
+        Initialize the tracker.
+
+        Args:
+            batch_size (int): The amount of settled messages that flushes the acks right away.
+            flush_interval (float): The maximum time in seconds a settled message waits for its ack.
+        """
+        self.messages: OrderedDict[int, AbstractIncomingMessage] = OrderedDict()
+        self.settled: dict[int, bool] = {}
+        self.batcher = Batcher(flush=self.flush, batch_size=batch_size, flush_interval=flush_interval)
+        self.logger = getLogger(settings.messages_logger_name)
+
+    def start(self) -> None:
+        """
+        Start flushing the acks.
+        """
+        self.batcher.start()
+
+    def track(self, message: AbstractIncomingMessage) -> None:
+        """
+        Start tracking a consumed message.
+
+        Args:
+            message (AbstractIncomingMessage): A message from RabbitMQ.
+        """
+        if self.messages and message.delivery_tag <= next(reversed(self.messages)):
+            self.messages.clear()
+            self.settled.clear()
+
+        self.messages[message.delivery_tag] = message
+
+    def complete(self, message: AbstractIncomingMessage) -> None:
+        """
+        Settle a message that should be acknowledged.
+
+        Args:
+            message (AbstractIncomingMessage): A message from RabbitMQ.
+        """
+        self.settle(message=message, acknowledge=True)
+
+    def settle(self, message: AbstractIncomingMessage, acknowledge: bool) -> None:
+        """
+        Settle a tracked message.
+
+        Args:
+            message (AbstractIncomingMessage): A message from RabbitMQ.
+            acknowledge (bool): Whether the message should be acknowledged or was rejected already.
+        """
+        if self.messages.get(message.delivery_tag) is not message:
+            return
+
+        self.settled[message.delivery_tag] = acknowledge
+        self.batcher.added(size=len(self.settled))
+
+    async def flush(self) -> None:
+        """
+        Acknowledge the settled messages.
+
+        The messages that have no unsettled message before them are acknowledged with a
+        cumulative ack, the rest one by one.
+        """
+        newest = None
+        acknowledged = 0
+
+        while self.messages:
+            delivery_tag = next(iter(self.messages))
+
+            if (acknowledge := self.settled.pop(delivery_tag, None)) is None:
+                break
+
+            message = self.messages.pop(delivery_tag)
+
+            if acknowledge:
+                newest = message
+                acknowledged += 1
+
+        behind_gap = []
+
+        for delivery_tag, acknowledge in self.settled.items():
+            message = self.messages.pop(delivery_tag)
+
+            if acknowledge:
+                behind_gap.append(message)
+
+        self.settled.clear()
+        self.batcher.taken()
+
+        if newest is not None and await self.acknowledge(message=newest, multiple=True):
+            rabbitmq_ack_batch_size.record(amount=acknowledged)
+
+        for message in behind_gap:
+            if await self.acknowledge(message=message, multiple=False):
+                rabbitmq_individual_acks.add(amount=1)
+
+    async def acknowledge(self, message: AbstractIncomingMessage, multiple: bool) -> bool:
+        """
+        Acknowledge a message, logging a failure.
+
+        Args:
+            message (AbstractIncomingMessage): A message from RabbitMQ.
+            multiple (bool): Whether every older message is acknowledged as well.
+
+        Returns:
+            bool: Whether the ack was sent.
+        """
+        try:
+            await message.ack(multiple=multiple)
+        except (AioPikaException, AioRMQException, RuntimeError) as exception:
+            self.logger.error(
+                'RabbitMQ acknowledgement error.',
+                extra={'user_id': None, 'event_type': f'Messages were not acknowledged: {exception}'},
+            )
+            return False
+
+        return True
+
+    async def close(self) -> None:
+        """
+        Stop flushing periodically and acknowledge what is settled.
+        """
+        self.batcher.stop()
+
+        await self.flush()
@@ -0,0 +1,128 @@
+from asyncio import create_task, Future, gather, get_running_loop, Semaphore, Task
+from collections.abc import Awaitable, Callable
+from logging import getLogger
+
+from aio_pika import Message
+
+from settings import settings
+
+from infrastructure.batching import Batcher
+
+
+class PublishPipeline:
+    """
+    The pipeline that publishes messages with many publisher confirms in flight.
+
+    Messages are collected into batches. A batch is flushed once it is full or once the
+    flush interval has passed since its first message. Every message of a flushed batch
+    is published at once, so the broker confirms them together instead of one round trip
+    per message. The amount of unconfirmed messages is bounded, submitting waits for a
+    free slot once the limit is reached.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[Message], Awaitable],
+        batch_size: int,
+        flush_interval: float,
+        max_in_flight: int,
+    ) -> None:
+        """
+        Initialize the pipeline.
+
+        Args:
+            publish (Callable): The coroutine function that publishes a single message and returns once it is confirmed.
+            batch_size (int): The amount of messages that flushes a batch right away.
+            flush_interval (float): The maximum time in seconds a message waits for its batch to be flushed.
+            max_in_flight (int): The maximum amount of submitted messages that are not confirmed yet.
+        """
+        self.publish = publish
+        self.in_flight = Semaphore(max_in_flight)
+        self.batch: list[tuple[Message, Future]] = []
+        self.batcher = Batcher(flush=self.flush, batch_size=batch_size, flush_interval=flush_interval)
+        self.publications: set[Task] = set()
+        self.logger = getLogger(settings.messages_logger_name)
+
+    def start(self) -> None:
+        """
+        Start flushing the batches.
+        """
+        self.batcher.start()
+
+    async def submit(self, message: Message) -> Future:
+        """
+        Add a message to the current batch.
+
+        Args:
+            message (Message): An instance of RabbitMQ Message.
+
+        Returns:
+            Future: The future that is resolved once the broker has confirmed the message
+                or set to the exception should the publishing fail.
+        """
+        await self.in_flight.acquire()
+
+        future = get_running_loop().create_future()
+        future.add_done_callback(self.report)
+
+        self.batch.append((message, future))
+        self.batcher.added(size=len(self.batch))
+
+        return future
+
+    async def flush(self) -> None:
+        """
+        Publish every message of the current batch without waiting for the confirms.
+        """
+        batch, self.batch = self.batch, []
+        self.batcher.taken()
+
+        for message, future in batch:
+            publication = create_task(self.confirm(message=message, future=future))
+            self.publications.add(publication)
+            publication.add_done_callback(self.publications.discard)
+
+    async def confirm(self, message: Message, future: Future) -> None:
+        """
+        Publish a message and resolve its future with the outcome of the confirm.
+
+        Args:
+            message (Message): An instance of RabbitMQ Message.
+            future (Future): The future of the message.
+        """
+        try:
+            await self.publish(message)
+        except Exception as exception:
+            if not future.done():
+                future.set_exception(exception)
+        else:
+            if not future.done():
+                future.set_result(None)
+        finally:
+            self.in_flight.release()
+
+    def report(self, future: Future) -> None:
+        """
+        Log a failed publication.
+
+        The failure is reported even if the caller does not wait for the future.
+
+        Args:
+            future (Future): The future of a message.
+        """
+        if not future.cancelled() and (exception := future.exception()) is not None:
+            self.logger.error(
+                'RabbitMQ publishing error.',
+                extra={'user_id': None, 'event_type': f'Message was not confirmed: {exception}'},
+            )
+
+    async def close(self) -> None:
+        """
+        Stop flushing periodically, publish what is left and wait for the confirms.
+        """
+        self.batcher.stop()
+
+        await self.flush()
+
+        if self.publications:
+            await gather(*self.publications, return_exceptions=True)
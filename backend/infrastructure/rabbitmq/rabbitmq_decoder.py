@@ -1,8 +1,19 @@
-from json import JSONDecodeError, loads
 from logging import getLogger
+from re import compile
 
 from settings import settings
 
+from infrastructure.codecs import Codec
+
+
+# The quotes inside JSON strings are always escaped, so a key that is not preceded by
+# a backslash can not be a part of the message body.
+USER_ID_PATTERNS = (
+    compile(rb'(?<!\\)"sender_id"\s*:\s*(-?\d+)'),
+    compile(rb'(?<!\\)"recipient_id"\s*:\s*(-?\d+)'),
+)
+MESSAGE_ID_PATTERN = compile(rb'(?<!\\)"id"\s*:\s*(\d+)')
+
 
 class RabbitMQDecoder:
     """
@@ -10,42 +21,74 @@ class RabbitMQDecoder:
     deserealizing messages from bytes to dict.
     """
 
-    def __init__(self, message: bytes) -> None:
+    def __init__(self, message: bytes, codec: Codec) -> None:
         """
         Initialize the decoder.
 
         Args:
             message (bytes): A message from RabbitMQ.
+            codec (Codec): The codec the messages are encoded with.
         """
         self.message = message
+        self.codec = codec
         self.logger = getLogger(settings.messages_logger_name)
 
     async def decode(self) -> dict | None:
         """
-        Decode message.
+        Decode message, logging it should it be impossible to decode it.
+
+        A message that is not an object with the integer ids of its sender and recipient
+        can not be routed, so it is logged and dropped as well.
 
         Returns:
             dict: A dictionary containing message data.
-
-        Raises:
-            AttributeError: Raisen if decoding was impossible.
-            JSONDecodeError: Raisen if a messages con not be transformed into a valid JSON.
         """
         try:
-            decoded_message_data = self.message.decode('utf-8')
-        except AttributeError:
+            message_data = self.codec.decode(self.message)
+        except ValueError:
             self.logger.error(
                 f'RabbitMQ message decoding error: {self.message}',
-                extra={'user_id': None, 'event_type': 'String instead of bytes'},
+                extra={'user_id': None, 'event_type': 'Error while decoding.'},
             )
-        else:
-
-            try:
-                clean_message_data = loads(decoded_message_data)
-            except JSONDecodeError:
-                self.logger.error(
-                    f'RabbitMQ message json error: {self.message}',
-                    extra={'user_id': None, 'event_type': 'Error while JSON parsing.'},
-                )
-            else:
-                return clean_message_data
+            return None
+
+        if not isinstance(message_data, dict) or not all(
+            isinstance(message_data.get(key), int) for key in ('sender_id', 'recipient_id')
+        ):
+            self.logger.error(
+                f'RabbitMQ message routing error: {self.message}',
+                extra={'user_id': None, 'event_type': 'Message has no sender or recipient.'},
+            )
+            return None
+
+        return message_data
+
+    def scan_participants(self) -> tuple[int, int] | None:
+        """
+        Extract the ids of the sender and the recipient without parsing the message.
+
+        The first occurrence of every key is used, which holds for the flat messages
+        produced by the storage service.
+
+        Returns:
+            tuple: The ids of the sender and the recipient if both were found.
+        """
+        participants = []
+
+        for pattern in USER_ID_PATTERNS:
+            if (match := pattern.search(self.message)) is None:
+                return None
+            participants.append(int(match.group(1)))
+
+        return tuple(participants)
+
+    def scan_message_id(self) -> int | None:
+        """
+        Extract the id the storage service assigned to the message without parsing it.
+
+        Returns:
+            int: The id of the message if it was found.
+        """
+        if (match := MESSAGE_ID_PATTERN.search(self.message)) is not None:
+            return int(match.group(1))
+        return None
@@ -1,15 +1,21 @@
-from asyncio import CancelledError, QueueFull
+from asyncio import CancelledError, Future, QueueFull
+from functools import partial
 from logging import getLogger
-from json import dumps
+from time import monotonic
 
 from aio_pika import AMQPException as AioPikaException, connect_robust, Exchange, ExchangeType, Message
+from aio_pika.abc import AbstractIncomingMessage
 from aiormq import AMQPException as AioRMQException
 
 from settings import settings
 
 from application.ports import RabbitMQManagerPort
-from infrastructure.rabbitmq import RabbitMQDecoder
-from infrastructure.transport import message_queue
+from domain.entities import Message as MessageEntity
+from domain.value_objects import MessageStatus
+from infrastructure.codecs import Codec, MessageSerializer
+from infrastructure.monitoring import rabbitmq_consumer_paused_time, rabbitmq_consumer_pauses
+from infrastructure.rabbitmq import AckTracker, PublishPipeline, RabbitMQDecoder
+from infrastructure.transport import Delivery, message_queue
 
 
 class RabbitMQManager(RabbitMQManagerPort):
@@ -18,24 +24,34 @@ class RabbitMQManager(RabbitMQManagerPort):
 
     Specifically for:
     - Starting the connection and ensuring the excistence of exchanges.
-    - Starting the consumption process for a user.
-    - Creating and sending messages.
+    - Starting the consumption process for a user and acknowledging the messages once delivered.
+    - Creating and sending messages through the publish pipeline.
     - Closing the connection.
     """
 
-    def __init__(self, process_id: str) -> None:
+    def __init__(self, process_id: str, codec: Codec) -> None:
         """
         Initialize the manager.
 
         Args:
             process_id (str): A string that identifies the process where an instance of this manager currently runs.
+            codec (Codec): The codec the messages are encoded with.
         """
         self.process_id = process_id
+        self.codec = codec
+        self.serializer = MessageSerializer(codec=codec, omit_defaults=settings.omit_default_message_fields)
         self.connection = None
         self.publishing_channel = None
         self.consumption_channel = None
         self.websockets_exchange: Exchange = None
         self.database_exchange: Exchange = None
+        self.publish_pipeline = PublishPipeline(
+            publish=self.publish,
+            batch_size=settings.publish_batch_size,
+            flush_interval=settings.publish_flush_interval,
+            max_in_flight=settings.publish_max_in_flight,
+        )
+        self.ack_tracker = AckTracker(batch_size=settings.ack_batch_size, flush_interval=settings.ack_flush_interval)
         self.logger = getLogger(settings.messages_logger_name)
 
     async def start(self) -> None:
@@ -44,6 +60,7 @@ class RabbitMQManager(RabbitMQManagerPort):
         - Create connection, 
         - Create publishing and consumption channels.
         - Create exchanges.
+        - Start the publish pipeline and the ack tracker.
         """
         self.connection = await connect_robust(settings.rabbitmq_url)
 
@@ -64,13 +81,21 @@ class RabbitMQManager(RabbitMQManagerPort):
             passive=True,
         )
 
+        self.publish_pipeline.start()
+        self.ack_tracker.start()
+
     async def consume(self) -> None:
         """
         Consume from websockets exchange.
 
         - Create the process queue.
         - Bind the queue.
-        - Consume messages from RabbitMQ.
+        - Consume messages from RabbitMQ, pausing while the dispatch queue is above the watermarks.
+
+        A message is acknowledged once it is written to the websockets of its users or
+        deliberately dropped, so a crash in between leads to a redelivery rather than a loss.
+        Messages that can not be routed are dropped, messages that do not fit into the
+        dispatch queue are returned to the broker.
         """
         print('CONSUMING')
         try:
@@ -84,12 +109,23 @@ class RabbitMQManager(RabbitMQManagerPort):
 
             async with process_queue.iterator() as queue_iterator:
                 async for message in queue_iterator:
+                    await self.wait_for_dispatch()
+
+                    self.ack_tracker.track(message=message)
+
+                    if (delivery := await self.create_delivery(message=message)) is None:
+                        self.ack_tracker.complete(message=message)
+                        continue
+
+                    delivery.on_done = partial(self.ack_tracker.complete, message=message)
+
                     try:
-                        async with message.process(requeue=False):
-                            decoded_message = await RabbitMQDecoder(message=message.body).decode()
-                            await message_queue.put(decoded_message)
+                        message_queue.put_nowait(delivery)
                     except QueueFull:
+                        self.ack_tracker.settle(message=message, acknowledge=False)
                         await message.nack(requeue=True)
+                    else:
+                        delivery.release()
         except (AioPikaException, AioRMQException) as exception:
             self.logger.error(
                 'RabbitMQ ephemeral queue error.',
@@ -98,36 +134,162 @@ class RabbitMQManager(RabbitMQManagerPort):
         except CancelledError:
             raise
 
-    def create_message(self, body: bytes) -> Message:
+    async def create_delivery(self, message: AbstractIncomingMessage) -> Delivery | None:
+        """
+        Create the delivery of a consumed message.
+
+        Should the ids of the users be known from the headers or from a partial scan of the
+        body, the body is passed through to the sockets as is. Otherwise the message is
+        decoded and encoded again by the dispatch workers.
+
+        Args:
+            message (AbstractIncomingMessage): A message from RabbitMQ.
+
+        Returns:
+            Delivery: The delivery of the message if the message could be routed.
+        """
+        if settings.rabbitmq_passthrough:
+            decoder = RabbitMQDecoder(message=message.body, codec=self.codec)
+            participants = self.read_participants(headers=message.headers)
+
+            if participants is None and settings.rabbitmq_passthrough_scan:
+                participants = decoder.scan_participants()
+
+            if participants is not None:
+                try:
+                    payload = message.body.decode('utf-8')
+                except UnicodeDecodeError:
+                    pass
+                else:
+                    delivery = Delivery(
+                        message_data=None,
+                        user_ids=set(participants),
+                        recipient_id=participants[1],
+                        message_id=self.read_message_id(headers=message.headers, decoder=decoder),
+                    )
+                    delivery.payload = payload
+                    return delivery
+
+        if (decoded_message := await RabbitMQDecoder(message=message.body, codec=self.codec).decode()) is not None:
+            return Delivery.create(message_data=decoded_message)
+
+    def read_participants(self, headers: dict) -> tuple[int, int] | None:
+        """
+        Read the ids of the sender and the recipient from the headers of a message.
+
+        Args:
+            headers (dict): The headers of a message from RabbitMQ.
+
+        Returns:
+            tuple: The ids of the sender and the recipient if both are present.
+        """
+        try:
+            return int(headers['sender_id']), int(headers['recipient_id'])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def read_message_id(self, headers: dict, decoder: RabbitMQDecoder) -> int | None:
+        """
+        Read the id of a passed through message for its delivery receipt.
+
+        The id is taken from the headers or scanned from the body, it is not looked
+        for at all if the delivery receipts are disabled.
+
+        Args:
+            headers (dict): The headers of a message from RabbitMQ.
+            decoder (RabbitMQDecoder): The decoder of the message body.
+
+        Returns:
+            int: The id of the message if it is known.
+        """
+        if not settings.delivery_receipts:
+            return None
+
+        try:
+            return int(headers['message_id'])
+        except (KeyError, TypeError, ValueError):
+            return decoder.scan_message_id()
+
+    async def wait_for_dispatch(self) -> None:
+        """
+        Pause the consumption while the dispatch queue is above the watermarks.
+
+        The message at hand is held unacknowledged, so once the prefetch limit is reached
+        the broker stops delivering to this process until the consumption is resumed.
+        """
+        if message_queue.accepting.is_set():
+            return
+
+        rabbitmq_consumer_pauses.add(amount=1)
+        paused_at = monotonic()
+
+        await message_queue.wait_until_accepting()
+
+        rabbitmq_consumer_paused_time.add(amount=monotonic() - paused_at)
+
+    def create_message(self, body: bytes, headers: dict | None = None) -> Message:
         """
         Create a RabbitMQ message.
 
         Args:
             body (bytes): A message body.
+            headers (dict | None): The headers of the message.
         
         Returns:
             Message: An instance of RabbitMQ Message.
         """
-        return Message(body=body, content_type='application/json', content_encoding='utf-8')
+        return Message(body=body, headers=headers, content_type='application/json', content_encoding='utf-8')
 
-    async def send_message(self, message_data: dict) -> None:
+    async def publish(self, message: Message) -> None:
+        """
+        Publish a message to the database exchange and wait for the broker to confirm it.
+
+        Args:
+            message (Message): An instance of RabbitMQ Message.
+        """
+        await self.database_exchange.publish(message=message, routing_key='')
+
+    async def send_message(self, message: MessageEntity) -> Future:
         """
         Send message to the exchange.
 
-        Dump and encode message data in the dictionary form, call the method to create an instance of
-        RabbitMQ Message and publish it to the respectful exchange.
+        Serialize the message entity, call the method to create an instance of RabbitMQ Message
+        and submit it to the publish pipeline. The confirm is not waited for.
+        The ids of the sender and the recipient travel in the headers as well, so that the
+        message can be routed back to the websockets without parsing it.
+
+        Args:
+            message (MessageEntity): The message entity.
+
+        Returns:
+            Future: The future that is resolved once the broker has confirmed the message.
+        """
+        body = self.serializer.serialize(message=message)
+        headers = {'sender_id': message.sender_id, 'recipient_id': message.recipient_id}
+        rabbitmq_message = self.create_message(body=body, headers=headers)
+        return await self.publish_pipeline.submit(message=rabbitmq_message)
+
+    async def send_receipts(self, receipts: list) -> Future:
+        """
+        Send a batch of delivery receipts to the database exchange.
 
         Args:
-            message_data (dict): A dictionary containing all the needed info to create a Message.
+            receipts (list): The [message_id, delivered_at] pairs of the delivered messages.
+
+        Returns:
+            Future: The future that is resolved once the broker has confirmed the batch.
         """
-        body = dumps(message_data).encode('utf-8')
-        rabbitmq_message = self.create_message(body=body)
-        await self.database_exchange.publish(message=rabbitmq_message, routing_key='')
+        body = self.codec.encode({'status': MessageStatus.DELIVERED.value, 'receipts': receipts})
+        rabbitmq_message = self.create_message(body=body, headers={'type': 'delivery_receipts'})
+        return await self.publish_pipeline.submit(message=rabbitmq_message)
 
     async def close(self) -> None:
         """
-        Close the connection to RabbitMQ.
+        Publish the pending messages, acknowledge the delivered ones and close the connection to RabbitMQ.
         """
+        await self.publish_pipeline.close()
+        await self.ack_tracker.close()
+
         if self.publishing_channel and not self.publishing_channel.is_closed:
             await self.publishing_channel.close()
         if self.connection and not self.connection.is_closed:
@@ -1 +1,2 @@
+from infrastructure.redis.command_batcher import RedisCommandBatcher
 from infrastructure.redis.redis_manager import RedisManager
@@ -1,13 +1,30 @@
+from asyncio import gather, sleep
+from collections.abc import Callable
+from logging import getLogger
+from typing import Any
+
 from redis.asyncio import from_url
+from redis.exceptions import RedisError
 
 from settings import settings
 
+from infrastructure.redis.command_batcher import RedisCommandBatcher
+
 
 class RedisManager:
     """
     The Redis manager.
 
     Responsible for orchestrating the workflow with Redis.
+
+    Unless batching is disabled, the commands of concurrent connects and disconnects
+    are coalesced into pipelined round trips by the command batcher.
+
+    Every process keeps a heartbeat key with a TTL and the set of the users it has mapped,
+    so that the mappings of a process can be removed in bulk on shutdown and the mappings
+    of crashed processes can be pruned by the sweeper of any other process. Should the
+    heartbeat of a live process lapse, e.g. during a Redis outage, its mappings may have
+    been pruned, so they are restored from the users connected to the hub.
     """
 
     def __init__(self, process_id: str) -> None:
@@ -19,21 +36,52 @@ class RedisManager:
         """
         self.redis = from_url(url=settings.redis_url, decode_responses=True, encoding='utf-8')
         self.process_id = process_id
+        self.batcher = None
+        self.logger = getLogger(settings.messages_logger_name)
+
+        if settings.redis_batching:
+            self.batcher = RedisCommandBatcher(
+                redis=self.redis,
+                batch_size=settings.redis_batch_size,
+                flush_interval=settings.redis_flush_interval,
+            )
+
+    async def execute(self, command: str, *args, **kwargs) -> Any:
+        """
+        Execute a command through the batcher or directly if batching is disabled.
+
+        Args:
+            command (str): The name of a Redis client method, e.g. sadd.
+            args: The positional arguments of the command.
+            kwargs: The keyword arguments of the command.
+
+        Returns:
+            Any: The result of the command.
+        """
+        if self.batcher is not None:
+            return await self.batcher.execute(command, *args, **kwargs)
+        return await getattr(self.redis, command)(*args, **kwargs)
 
     async def map_connection(self, user_id: int) -> None:
         """
         Map a connection of a user to the websocket hub shard.
 
         When connected the k: v pair of user id and process id is stored in Redis
-        for further message routing.
+        for further message routing. The user is added to the users of the process as well.
         """
-        await self.redis.sadd(f'connections:user:{user_id}', self.process_id)
+        await gather(
+            self.execute('sadd', f'connections:user:{user_id}', self.process_id),
+            self.execute('sadd', f'connections:process:{self.process_id}', user_id),
+        )
 
     async def remove_mapping(self, user_id: int) -> None:
         """
         Remove previously mapped connection from the Redis.
         """
-        await self.redis.srem(f'connections:user:{user_id}', self.process_id)
+        await gather(
+            self.execute('srem', f'connections:user:{user_id}', self.process_id),
+            self.execute('srem', f'connections:process:{self.process_id}', user_id),
+        )
 
     async def add_connection_pass(self, connection_pass: str, user_id: int) -> None:
         """
@@ -44,7 +92,7 @@ class RedisManager:
             connection_pass (str): The unique token that will be used as a key to retrieve user_id.
             user_id (int): The id of a user to authenticate him upon connection to the websocket endpoint.
         """
-        await self.redis.set(connection_pass, str(user_id), ex=settings.connection_pass_expiration_time)
+        await self.execute('set', connection_pass, str(user_id), ex=settings.connection_pass_expiration_time)
 
     async def retrieve_user_id_from_pass(self, connection_pass: str) -> str | None:
         """
@@ -56,4 +104,111 @@ class RedisManager:
         Returns:
             str: A user_id related to the provided connection pass if such exists.
         """
-        return await self.redis.getdel(name=connection_pass)
+        return await self.execute('getdel', name=connection_pass)
+
+    async def heartbeat(self, connected_user_ids: Callable[[], list[int]]) -> None:
+        """
+        Keep the heartbeat key of the process alive.
+
+        The key expires after the heartbeat TTL, so it disappears shortly after the
+        process stops refreshing it. A key found lapsed after the first beat means the
+        sweepers may have removed the mappings of the process, so the connected users
+        are mapped again.
+
+        Args:
+            connected_user_ids (Callable): Lists the users connected to the process.
+        """
+        beaten = False
+        lapsed = False
+
+        while True:
+            try:
+                previous = await self.redis.set(
+                    f'processes:alive:{self.process_id}',
+                    '1',
+                    ex=settings.process_heartbeat_ttl,
+                    get=True,
+                )
+
+                if previous is None and beaten:
+                    lapsed = True
+                    self.logger.warning(
+                        'Redis heartbeat lapsed.',
+                        extra={'user_id': None, 'event_type': 'Mappings of the process are restored.'},
+                    )
+
+                beaten = True
+
+                if lapsed:
+                    await self.remap(user_ids=connected_user_ids())
+                    lapsed = False
+            except RedisError as exception:
+                self.logger.error(
+                    'Redis heartbeat error.',
+                    extra={'user_id': None, 'event_type': f'Heartbeat was not refreshed: {exception}'},
+                )
+
+            await sleep(settings.process_heartbeat_interval)
+
+    async def remap(self, user_ids: list[int]) -> None:
+        """
+        Map the connections of the users to the process again in a single round trip.
+
+        Args:
+            user_ids (list[int]): The ids of the users connected to the process.
+        """
+        if not user_ids:
+            return
+
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for user_id in user_ids:
+                pipeline.sadd(f'connections:user:{user_id}', self.process_id)
+
+            pipeline.sadd(f'connections:process:{self.process_id}', *user_ids)
+            await pipeline.execute()
+
+    async def sweep(self) -> None:
+        """
+        Periodically remove the mappings of the processes whose heartbeat has expired.
+        """
+        while True:
+            await sleep(settings.dead_processes_sweep_interval)
+
+            try:
+                async for key in self.redis.scan_iter(match='connections:process:*'):
+                    process_id = key.removeprefix('connections:process:')
+
+                    if not await self.redis.exists(f'processes:alive:{process_id}'):
+                        await self.remove_process_mappings(process_id=process_id)
+            except RedisError as exception:
+                self.logger.error(
+                    'Redis sweeping error.',
+                    extra={'user_id': None, 'event_type': f'Dead processes were not swept: {exception}'},
+                )
+
+    async def remove_process_mappings(self, process_id: str) -> None:
+        """
+        Remove every mapping of a process and its heartbeat in a single round trip.
+
+        Args:
+            process_id (str): The id of the process whose mappings are removed.
+        """
+        user_ids = await self.redis.smembers(f'connections:process:{process_id}')
+
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for user_id in user_ids:
+                pipeline.srem(f'connections:user:{user_id}', process_id)
+
+            pipeline.delete(f'connections:process:{process_id}', f'processes:alive:{process_id}')
+            await pipeline.execute()
+
+    async def close(self) -> None:
+        """
+        Send the pending commands, remove the mappings of the process and close
+        the connection to Redis.
+        """
+        if self.batcher is not None:
+            await self.batcher.close()
+
+        await self.remove_process_mappings(process_id=self.process_id)
+        await self.redis.aclose()
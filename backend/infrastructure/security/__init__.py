@@ -1,2 +1,3 @@
 from infrastructure.security.connection_pass_manager import ConnectionPassManager
 from infrastructure.security.jwt_manager import JWTManager
+from infrastructure.security.signed_connection_pass_manager import SignedConnectionPassManager
@@ -1,20 +1,55 @@
-from secrets import choice
-from string import ascii_letters, digits
+from secrets import token_urlsafe
 
 from settings import settings
 
+from application.ports import ConnectionPassManagerPort
+from infrastructure.redis import RedisManager
 
-class ConnectionPassManager:
+
+class ConnectionPassManager(ConnectionPassManagerPort):
     """
-    The connection pass manager.
+    The Redis backed connection pass manager.
 
     Responsible for issuing a unique tokens that are used to authenticate user upon connection
-    to the websocket endpoint.
+    to the websocket endpoint. The token: user_id pairs are stored in Redis and removed upon
+    the first redemption.
     """
 
-    async def issue_pass(self) -> str:
+    def __init__(self, redis_manager: RedisManager) -> None:
+        """
+        Initialize class.
+
+        Args:
+            redis_manager (RedisManager): The manager that stores the issued passes.
         """
-        Issue a unique token.
+        self.redis_manager = redis_manager
+        self.length = int(settings.connection_pass_length)
+
+    async def issue_pass(self, user_id: int) -> str:
+        """
+        Issue a unique token and store it in Redis.
+
+        Args:
+            user_id (int): The id of the user that the pass is issued for.
+
+        Returns:
+            str: The issued connection pass.
+        """
+        connection_pass = token_urlsafe(self.length)[:self.length]
+        await self.redis_manager.add_connection_pass(connection_pass=connection_pass, user_id=user_id)
+
+        return connection_pass
+
+    async def redeem_pass(self, connection_pass: str) -> int | None:
+        """
+        Retrieve and remove the user id stored for the pass.
+
+        Args:
+            connection_pass (str): A previously issued connection pass.
+
+        Returns:
+            int | None: The id of the user or None if the pass is unknown.
         """
-        pool = ascii_letters + digits
-        return ''.join(choice(pool) for _ in range(int(settings.connection_pass_length)))
+        if (user_id := await self.redis_manager.retrieve_user_id_from_pass(connection_pass=connection_pass)) is not None:
+            return int(user_id)
+        return None
@@ -1,20 +1,39 @@
+from collections import OrderedDict
+from hashlib import sha256
+from time import time
+
 from jwt import decode, PyJWTError
 
 from settings import settings
 
 from infrastructure.exceptions import AuthenticationException
+from infrastructure.monitoring import jwt_cache_hits, jwt_cache_misses
 
 
 class JWTManager:
     """
     The JSON Web Token Manager that orchestrates the workflow with tokens.
+
+    The user ids of verified tokens are kept in a bounded LRU cache keyed by the digest
+    of a token until the token expires, so the tokens that clients reuse are not decoded
+    and verified on every request. Tokens without the expiration claim are never cached.
     """
 
-    async def retrieve_user_id(self, token: str) -> None:
+    def __init__(self) -> None:
+        """
+        Initialize class.
+        """
+        self.cache: OrderedDict[bytes, tuple[int, float]] = OrderedDict()
+        self.cache_size = settings.jwt_cache_size
+
+    async def retrieve_user_id(self, token: str) -> int:
         """
         Decode a token. Verify it's validity and extract a user_id that should be stored in the payload
         section of a token.
 
+        A user_id stored as a string is converted, a user_id that is not a 64-bit integer
+        is rejected, so every connection pass mode gets the same id.
+
         Args:
             token (str): A JWT.
 
@@ -24,6 +43,20 @@ class JWTManager:
         Raises:
             AuthenticationException: Raisen if a token was invalid or user_id is not in the payload.
         """
+        digest = sha256(token.encode('utf-8')).digest()
+
+        if (cached := self.cache.get(digest)) is not None:
+            user_id, expires_at = cached
+
+            if expires_at > time():
+                self.cache.move_to_end(digest)
+                jwt_cache_hits.add(amount=1)
+                return user_id
+
+            del self.cache[digest]
+
+        jwt_cache_misses.add(amount=1)
+
         try:
             payload = decode(jwt=token, key=settings.key, algorithms=[settings.algorithm])
         except PyJWTError:
@@ -32,9 +65,38 @@ class JWTManager:
                 details={'non-field-error': 'An invalid token was provided.'},
             )
 
-        if (user_id := payload.get('user_id')) is not None:
+        if (user_id := self.read_user_id(payload=payload)) is not None:
+            if isinstance(expires_at := payload.get('exp'), int | float) and self.cache_size > 0:
+                self.cache[digest] = (user_id, expires_at)
+
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+
             return user_id
         raise AuthenticationException(
             title='Authentication exception.',
             details={'non-field-error': 'Invalid payload in the token.'},
         )
+
+    def read_user_id(self, payload: dict) -> int | None:
+        """
+        Read the user_id from the payload of a token.
+
+        Args:
+            payload (dict): The decoded payload of a token.
+
+        Returns:
+            int | None: The id of the user if it is an integer or a string of one within 64 bits.
+        """
+        if isinstance(user_id := payload.get('user_id'), bool) or not isinstance(user_id, int | str):
+            return None
+
+        try:
+            user_id = int(user_id)
+        except ValueError:
+            return None
+
+        if not -2 ** 63 <= user_id < 2 ** 63:
+            return None
+
+        return user_id
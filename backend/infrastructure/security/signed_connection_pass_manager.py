@@ -0,0 +1,115 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from collections import OrderedDict
+from hashlib import sha256
+from hmac import compare_digest, new
+from secrets import token_bytes
+from struct import error as StructError, pack, unpack
+from time import time
+
+from settings import settings
+
+from application.ports import ConnectionPassManagerPort
+
+
+class SignedConnectionPassManager(ConnectionPassManagerPort):
+    """
+    The stateless connection pass manager.
+
+    A pass carries the user id, its expiration time and a random nonce signed with HMAC-SHA256,
+    so it is verified locally without a round trip to Redis. Single usage is enforced by
+    the replay filter that remembers the nonces of the redeemed passes until they expire.
+
+    The replay filter is kept in the memory of the process, so a pass can be redeemed once
+    per process. Such passes live for a few seconds only and are bound to the user they
+    were issued for.
+    """
+
+    PAYLOAD_FORMAT = '>qI8s'
+    SIGNATURE_LENGTH = 16
+
+    def __init__(self) -> None:
+        """
+        Initialize class.
+        """
+        self.key = sha256(b'connection-pass:' + settings.key.encode('utf-8')).digest()
+        self.expiration_time = int(settings.connection_pass_expiration_time)
+        self.redeemed_nonces: OrderedDict[bytes, int] = OrderedDict()
+
+    def sign(self, payload: bytes) -> bytes:
+        """
+        Sign the payload of a pass.
+
+        Args:
+            payload (bytes): The packed payload.
+
+        Returns:
+            bytes: The truncated HMAC-SHA256 signature.
+        """
+        return new(self.key, payload, sha256).digest()[:self.SIGNATURE_LENGTH]
+
+    async def issue_pass(self, user_id: int) -> str:
+        """
+        Issue a signed pass.
+
+        Args:
+            user_id (int): The id of the user that the pass is issued for.
+
+        Returns:
+            str: The issued connection pass.
+        """
+        payload = pack(self.PAYLOAD_FORMAT, int(user_id), int(time()) + self.expiration_time, token_bytes(8))
+
+        return urlsafe_b64encode(payload + self.sign(payload=payload)).rstrip(b'=').decode('ascii')
+
+    async def redeem_pass(self, connection_pass: str) -> int | None:
+        """
+        Verify the signature and the expiration time of a pass and mark it as used.
+
+        Args:
+            connection_pass (str): A previously issued connection pass.
+
+        Returns:
+            int | None: The id of the user or None if the pass is invalid, expired or was already used.
+        """
+        try:
+            token = urlsafe_b64decode(connection_pass + '=' * (-len(connection_pass) % 4))
+            payload, signature = token[:-self.SIGNATURE_LENGTH], token[-self.SIGNATURE_LENGTH:]
+            user_id, expires_at, nonce = unpack(self.PAYLOAD_FORMAT, payload)
+        except (BinasciiError, StructError, ValueError):
+            return None
+
+        if not compare_digest(signature, self.sign(payload=payload)):
+            return None
+
+        now = int(time())
+
+        if expires_at < now:
+            return None
+
+        self.forget_expired_nonces(now=now)
+
+        if nonce in self.redeemed_nonces:
+            return None
+
+        self.redeemed_nonces[nonce] = expires_at
+
+        return user_id
+
+    def forget_expired_nonces(self, now: int) -> None:
+        """
+        Drop the nonces of the passes that have expired and can not be replayed anymore.
+
+        Passes share the same lifetime, so the nonces are redeemed roughly in the order
+        of their expiration.
+
+        Args:
+            now (int): The current timestamp.
+        """
+        while self.redeemed_nonces:
+            nonce, expires_at = next(iter(self.redeemed_nonces.items()))
+
+            if expires_at >= now:
+                break
+
+            del self.redeemed_nonces[nonce]
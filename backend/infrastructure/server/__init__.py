@@ -0,0 +1,4 @@
+from infrastructure.server.compressing_websocket_protocol import CompressingWebSocketProtocol
+from infrastructure.server.draining_server import DrainingServer
+from infrastructure.server.threshold_deflate_factory import ThresholdDeflateFactory
+from infrastructure.server.threshold_per_message_deflate import ThresholdPerMessageDeflate
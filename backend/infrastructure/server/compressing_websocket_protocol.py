@@ -0,0 +1,33 @@
+from uvicorn.protocols.websockets.websockets_impl import WebSocketProtocol
+
+from settings import settings
+
+from infrastructure.server.threshold_deflate_factory import ThresholdDeflateFactory
+
+
+class CompressingWebSocketProtocol(WebSocketProtocol):
+    """
+    The uvicorn websocket protocol with configurable permessage-deflate.
+
+    uvicorn offers permessage-deflate with the defaults of websockets only. This protocol
+    negotiates it with the window size, the memory level and the context takeover from
+    the settings and leaves the messages below the compression threshold uncompressed.
+    Without context takeover every message is compressed from scratch, so a connection
+    holds no compressor between the messages.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        """
+        Initialize the protocol.
+        """
+        super().__init__(*args, **kwargs)
+
+        if self.config.ws_per_message_deflate:
+            self.available_extensions = [
+                ThresholdDeflateFactory(
+                    server_no_context_takeover=not settings.websocket_compression_context_takeover,
+                    server_max_window_bits=settings.websocket_compression_window_bits,
+                    compress_settings={'memLevel': settings.websocket_compression_memory_level},
+                    min_size=settings.websocket_compression_min_size,
+                ),
+            ]
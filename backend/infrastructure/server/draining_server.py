@@ -0,0 +1,37 @@
+from socket import socket
+
+from starlette.applications import Starlette
+from uvicorn import Server
+
+
+class DrainingServer(Server):
+    """
+    The uvicorn server that drains the application before closing the connections.
+
+    uvicorn closes every open websocket as soon as the shutdown starts and only then
+    runs the lifespan shutdown. This server stops listening first and awaits the drain
+    hook the lifespan stores in the application state, so the queued deliveries are
+    written and the sockets are closed with reconnect hints.
+    """
+
+    async def shutdown(self, sockets: list[socket] | None = None) -> None:
+        """
+        Stop listening, drain the application and shut down.
+
+        Args:
+            sockets (list[socket] | None): The sockets shared by the workers.
+        """
+        for server in self.servers:
+            server.close()
+        for sock in sockets or []:
+            sock.close()
+
+        application = self.config.loaded_app
+
+        while not isinstance(application, Starlette) and hasattr(application, 'app'):
+            application = application.app
+
+        if not self.force_exit and (drain := getattr(application.state, 'drain', None)) is not None:
+            await drain()
+
+        await super().shutdown(sockets=sockets)
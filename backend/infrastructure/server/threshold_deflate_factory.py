@@ -0,0 +1,55 @@
+from collections.abc import Sequence
+
+from websockets.extensions.base import Extension
+from websockets.extensions.permessage_deflate import ServerPerMessageDeflateFactory
+from websockets.typing import ExtensionParameter
+
+from infrastructure.server.threshold_per_message_deflate import ThresholdPerMessageDeflate
+
+
+class ThresholdDeflateFactory(ServerPerMessageDeflateFactory):
+    """
+    The factory that negotiates permessage-deflate with a compression threshold.
+
+    The negotiation itself is left to websockets, the negotiated extension is replaced
+    with the one that leaves the messages below the threshold uncompressed.
+    """
+
+    def __init__(self, *args, min_size: int, **kwargs) -> None:
+        """
+        Initialize the factory.
+
+        Args:
+            min_size (int): The size of a message in bytes below which it is not compressed.
+        """
+        super().__init__(*args, **kwargs)
+        self.min_size = min_size
+
+    def process_request_params(
+        self,
+        params: Sequence[ExtensionParameter],
+        accepted_extensions: Sequence[Extension],
+    ) -> tuple[list[ExtensionParameter], ThresholdPerMessageDeflate]:
+        """
+        Negotiate the extension with the parameters offered by the client.
+
+        Args:
+            params (Sequence): The parameters offered by the client.
+            accepted_extensions (Sequence): The extensions accepted so far.
+
+        Returns:
+            tuple: The parameters of the response and the negotiated extension.
+
+        Raises:
+            NegotiationError: Raisen if the offer of the client can not be accepted.
+        """
+        response_params, extension = super().process_request_params(params, accepted_extensions)
+
+        return response_params, ThresholdPerMessageDeflate(
+            remote_no_context_takeover=extension.remote_no_context_takeover,
+            local_no_context_takeover=extension.local_no_context_takeover,
+            remote_max_window_bits=extension.remote_max_window_bits,
+            local_max_window_bits=extension.local_max_window_bits,
+            compress_settings=extension.compress_settings,
+            min_size=self.min_size,
+        )
@@ -0,0 +1,38 @@
+from websockets.extensions.permessage_deflate import PerMessageDeflate
+from websockets.frames import Frame, OP_BINARY, OP_TEXT
+
+
+class ThresholdPerMessageDeflate(PerMessageDeflate):
+    """
+    The permessage-deflate extension that leaves small messages uncompressed.
+
+    A message that fits into a single frame and is smaller than the threshold is sent as
+    is, the compression of such a message costs more CPU than the bytes it saves. The
+    extension allows the messages of a connection to be compressed selectively, so the
+    peer decodes both kinds.
+    """
+
+    def __init__(self, *args, min_size: int, **kwargs) -> None:
+        """
+        Initialize the extension.
+
+        Args:
+            min_size (int): The size of a message in bytes below which it is not compressed.
+        """
+        super().__init__(*args, **kwargs)
+        self.min_size = min_size
+
+    def encode(self, frame: Frame) -> Frame:
+        """
+        Compress an outgoing frame unless it is a small message.
+
+        Args:
+            frame (Frame): An outgoing frame.
+
+        Returns:
+            Frame: The frame to write.
+        """
+        if frame.fin and frame.opcode in (OP_TEXT, OP_BINARY) and len(frame.data) < self.min_size:
+            return frame
+
+        return super().encode(frame)
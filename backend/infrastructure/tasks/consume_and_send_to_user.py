@@ -1,7 +1,10 @@
 from asyncio import CancelledError
+from logging import getLogger
 
 from dependency_injector.wiring import inject, Provide
 
+from settings import settings
+
 from infrastructure.dependency_injector import DependenciesContainer
 from infrastructure.transport import message_queue
 from infrastructure.websocket_hub import WebSocketHub
@@ -9,19 +12,36 @@ from infrastructure.websocket_hub import WebSocketHub
 
 @inject
 async def consume_and_send_to_user(
+    shard_index: int,
     websocket_hub: WebSocketHub = Provide[DependenciesContainer.websocket_hub],
 ) -> None:
     """
-    Consumes messages from the queue and then calls websocket hub to send messages to users.
+    Consumes deliveries from a shard of the queue and then calls websocket hub to send messages to users.
+
+    A delivery that fails to be encoded, e.g. a malformed passthrough body, is logged and
+    skipped, so it never stops the worker of its shard.
+
+    Args:
+        shard_index (int): The index of the shard this worker drains.
     """
+    logger = getLogger(settings.messages_logger_name)
 
     try:
         while True:
-            message_data = await message_queue.get()
+            delivery, user_ids = await message_queue.get(shard_index=shard_index)
 
-            sender_id = message_data.get('sender_id')
-            recipient_id = message_data.get('recipient_id')
+            try:
+                if delivery.payload is None:
+                    delivery.payload = websocket_hub.encode(message_data=delivery.message_data)
 
-            await websocket_hub.send(message_data=message_data, user_ids={sender_id, recipient_id})
+                await websocket_hub.broadcast(payload=delivery.payload, user_ids=user_ids, delivery=delivery)
+            except Exception as exception:
+                logger.error(
+                    'Delivery error.',
+                    extra={'user_id': None, 'event_type': f'Message {delivery.message_id} was not sent: {exception}'},
+                )
+            finally:
+                delivery.release()
+                message_queue.task_done(shard_index=shard_index)
     except CancelledError:
         raise
@@ -1 +1,3 @@
+from infrastructure.transport.delivery import Delivery
+from infrastructure.transport.sharded_queue import ShardedQueue
 from infrastructure.transport.message_queue import message_queue
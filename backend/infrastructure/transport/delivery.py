@@ -0,0 +1,91 @@
+from collections.abc import Callable
+
+
+class Delivery:
+    """
+    A message consumed from the broker on its way to the websockets.
+
+    The payload is encoded once by the first dispatch worker that needs it and then
+    shared by every worker and socket the message is delivered to. The same holds for
+    the encodings of the binary subprotocols, which are cached by codec name.
+
+    Every shard, socket queue and the consumer itself hold a reference to the delivery
+    while it is on its way. Once the last reference is released the message is settled
+    and the done callback is called, so the message can be acknowledged.
+    """
+
+    __slots__ = (
+        'message_data',
+        'user_ids',
+        'recipient_id',
+        'message_id',
+        'payload',
+        'encodings',
+        'references',
+        'on_done',
+    )
+
+    def __init__(
+        self,
+        message_data: dict,
+        user_ids: set,
+        recipient_id: int | None = None,
+        message_id: int | None = None,
+        on_done: Callable[[], None] | None = None,
+    ) -> None:
+        """
+        Initialize the delivery.
+
+        The delivery starts with a single reference held by its creator.
+
+        Args:
+            message_data (dict): A message in the form of a dictionary.
+            user_ids (set): The ids of the users that should receive the message.
+            recipient_id (int | None): The id of the recipient the delivery receipt is issued for.
+            message_id (int | None): The id the storage service assigned to the message.
+            on_done (Callable | None): Called once every reference is released.
+        """
+        self.message_data = message_data
+        self.user_ids = user_ids
+        self.recipient_id = recipient_id
+        self.message_id = message_id
+        self.payload: str | None = None
+        self.encodings: dict[str, bytes] | None = None
+        self.references = 1
+        self.on_done = on_done
+
+    @classmethod
+    def create(cls, message_data: dict) -> 'Delivery':
+        """
+        Create a delivery of a message to its sender and recipient.
+
+        Args:
+            message_data (dict): A message in the form of a dictionary.
+
+        Returns:
+            Delivery: A new Delivery object.
+        """
+        return cls(
+            message_data=message_data,
+            user_ids={message_data.get('sender_id'), message_data.get('recipient_id')},
+            recipient_id=message_data.get('recipient_id'),
+            message_id=message_data.get('id'),
+        )
+
+    def acquire(self, count: int = 1) -> None:
+        """
+        Take references to the delivery.
+
+        Args:
+            count (int): The amount of references.
+        """
+        self.references += count
+
+    def release(self) -> None:
+        """
+        Release a reference to the delivery and settle it once none is left.
+        """
+        self.references -= 1
+
+        if self.references == 0 and self.on_done is not None:
+            self.on_done()
@@ -1,5 +1,12 @@
-from asyncio import Queue
+from settings import settings
 
-# Global asyncio queue that temporarily stores decoded messages
+from infrastructure.transport.sharded_queue import ShardedQueue
+
+# Global sharded queue that temporarily stores the deliveries of the messages
 # received from RabbitMQ before they are dispatched to users.
-message_queue = Queue()
+message_queue = ShardedQueue(
+    shards_count=settings.dispatch_workers_count,
+    shard_size=settings.dispatch_shard_queue_size,
+    high_watermark=settings.dispatch_shard_high_watermark,
+    low_watermark=settings.dispatch_shard_low_watermark,
+)
@@ -0,0 +1,123 @@
+from asyncio import Event, gather, Queue, QueueFull
+
+from infrastructure.monitoring import dispatch_shard_queue_depth
+from infrastructure.transport.delivery import Delivery
+
+
+class ShardedQueue:
+    """
+    The queue that shards the deliveries between the dispatch workers by user id.
+
+    Every user always lands on the same shard and every shard is drained by a single
+    worker, so the messages of a user are delivered in order. The shards are bounded
+    independently, so an overloaded shard does not hold up the others.
+
+    Once a shard reaches the high watermark the queue stops accepting deliveries until
+    every shard is drained down to the low watermark, which lets the producer pause
+    long before any shard is actually full.
+    """
+
+    def __init__(self, shards_count: int, shard_size: int, high_watermark: int, low_watermark: int) -> None:
+        """
+        Initialize the queue.
+
+        Args:
+            shards_count (int): The amount of shards, one per dispatch worker.
+            shard_size (int): The maximum amount of deliveries waiting in a shard.
+            high_watermark (int): The depth of a shard that stops accepting deliveries.
+            low_watermark (int): The depth every shard has to drain to before accepting again.
+        """
+        self.shards = [Queue(maxsize=shard_size) for _ in range(shards_count)]
+        self.attributes = [{'shard': str(shard_index)} for shard_index in range(shards_count)]
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.overloaded_shards: set[int] = set()
+        self.accepting = Event()
+        self.accepting.set()
+
+    def shard_index(self, user_id: int) -> int:
+        """
+        Get the index of the shard a user belongs to.
+
+        Args:
+            user_id (int): The id of a user.
+
+        Returns:
+            int: The index of the shard.
+        """
+        return hash(user_id) % len(self.shards)
+
+    def put_nowait(self, delivery: Delivery) -> None:
+        """
+        Put a delivery on the shards of its users.
+
+        The delivery is put either on all of its shards or on none of them. Every shard
+        it is put on holds a reference to it until the delivery is dispatched.
+
+        Args:
+            delivery (Delivery): A message on its way to the websockets.
+
+        Raises:
+            QueueFull: Raisen if any of the shards of the delivery is full.
+        """
+        user_ids_by_shard = {}
+
+        for user_id in delivery.user_ids:
+            user_ids_by_shard.setdefault(self.shard_index(user_id=user_id), set()).add(user_id)
+
+        if any(self.shards[shard_index].full() for shard_index in user_ids_by_shard):
+            raise QueueFull
+
+        for shard_index, user_ids in user_ids_by_shard.items():
+            shard = self.shards[shard_index]
+            shard.put_nowait((delivery, user_ids))
+            dispatch_shard_queue_depth.add(amount=1, attributes=self.attributes[shard_index])
+
+            if shard.qsize() >= self.high_watermark:
+                self.overloaded_shards.add(shard_index)
+                self.accepting.clear()
+
+        delivery.acquire(count=len(user_ids_by_shard))
+
+    async def get(self, shard_index: int) -> tuple[Delivery, set]:
+        """
+        Take the next delivery from a shard, waiting for one if the shard is empty.
+
+        Args:
+            shard_index (int): The index of the shard.
+
+        Returns:
+            tuple: The delivery and the ids of its users that belong to the shard.
+        """
+        shard = self.shards[shard_index]
+        entry = await shard.get()
+        dispatch_shard_queue_depth.add(amount=-1, attributes=self.attributes[shard_index])
+
+        if shard_index in self.overloaded_shards and shard.qsize() <= self.low_watermark:
+            self.overloaded_shards.discard(shard_index)
+
+            if not self.overloaded_shards:
+                self.accepting.set()
+
+        return entry
+
+    def task_done(self, shard_index: int) -> None:
+        """
+        Mark a delivery taken from a shard as dispatched.
+
+        Args:
+            shard_index (int): The index of the shard.
+        """
+        self.shards[shard_index].task_done()
+
+    async def join(self) -> None:
+        """
+        Wait until every delivery put on the shards is dispatched.
+        """
+        await gather(*(shard.join() for shard in self.shards))
+
+    async def wait_until_accepting(self) -> None:
+        """
+        Wait until every shard is below the watermarks.
+        """
+        await self.accepting.wait()
@@ -1 +1,4 @@
+from infrastructure.websocket_hub.connection import Connection
+from infrastructure.websocket_hub.delivery_receipts import DeliveryReceipts
+from infrastructure.websocket_hub.overflow_policy import OverflowPolicy
 from infrastructure.websocket_hub.websocket_hub import WebSocketHub
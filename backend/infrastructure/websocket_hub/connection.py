@@ -0,0 +1,384 @@
+from asyncio import create_task, get_running_loop, Queue, QueueEmpty, QueueFull, sleep, Task, timeout_at, wait_for
+from collections.abc import Callable
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from settings import settings
+
+from infrastructure.codecs import Codec
+from infrastructure.monitoring import (
+    websocket_coalesced_frame_size,
+    websocket_outbound_overflows,
+    websocket_outbound_queue_depth,
+    websocket_outbound_send_timeouts,
+)
+from infrastructure.transport import Delivery
+from infrastructure.websocket_hub.overflow_policy import OverflowPolicy
+
+
+class Connection:
+    """
+    A websocket connected to the hub together with its outbound queue.
+
+    Frames for the socket are put on a bounded queue and written by the writer task of
+    the connection, so a slow client never holds up the deliveries to other sockets.
+    What happens when the queue is full is defined by the overflow policy.
+
+    A queued frame holds the delivery it belongs to until the frame is written or
+    dropped, so the message is acknowledged to the broker only after that. Once a
+    message is written to a socket of its recipient its delivery is reported.
+
+    A socket that opted in to coalescing has the frames queued within the coalescing
+    window after a frame written together with it as a single array frame, up to the
+    maximum size of a coalesced frame.
+    """
+
+    def __init__(
+        self,
+        user_id: int,
+        websocket: WebSocket,
+        queue_size: int,
+        overflow_policy: OverflowPolicy,
+        on_delivered: Callable[[int], None] | None = None,
+        codec: Codec | None = None,
+        coalescing_window: float | None = None,
+        coalescing_max_bytes: int = 0,
+        overflow_max_bytes: int = 0,
+    ) -> None:
+        """
+        Initialize the connection.
+
+        Args:
+            user_id (int): The id of the user the socket belongs to.
+            websocket (WebSocket): An instance of FastAPI WebSocket.
+            queue_size (int): The maximum amount of frames waiting to be written.
+            overflow_policy (OverflowPolicy): What to do when the queue is full.
+            on_delivered (Callable | None): Called with the id of a message written to its recipient.
+            codec (Codec | None): The codec of the negotiated binary subprotocol, None for text JSON.
+            coalescing_window (float | None): The time in seconds to wait for frames to coalesce, None to not coalesce.
+            coalescing_max_bytes (int): The size of the payloads that closes a coalesced frame.
+            overflow_max_bytes (int): The maximum size of the payloads merged by the COALESCE overflow policy.
+        """
+        self.user_id = user_id
+        self.websocket = websocket
+        self.queue = Queue(maxsize=queue_size)
+        self.overflow_policy = overflow_policy
+        self.on_delivered = on_delivered
+        self.codec = codec
+        self.coalescing_window = coalescing_window
+        self.coalescing_max_bytes = coalescing_max_bytes
+        self.overflow_max_bytes = overflow_max_bytes
+        self.attributes = {'overflow_policy': overflow_policy.value}
+        self.writer: Task | None = None
+        self.closer: Task | None = None
+        self.closed = False
+
+    def start(self) -> None:
+        """
+        Start the writer task of the connection.
+        """
+        self.writer = create_task(self.write())
+
+    def put(self, payload: str | bytes, delivery: Delivery | None = None) -> None:
+        """
+        Queue a frame for the socket without waiting for it to be written.
+
+        Args:
+            payload (str | bytes): An encoded message, bytes for binary subprotocols.
+            delivery (Delivery | None): The delivery the payload belongs to.
+        """
+        if self.closed:
+            return
+
+        if delivery is not None:
+            delivery.acquire()
+
+        entry = (payload, delivery)
+
+        try:
+            self.queue.put_nowait(entry)
+        except QueueFull:
+            websocket_outbound_overflows.add(amount=1, attributes=self.attributes)
+            self.overflow(entry=entry)
+        else:
+            websocket_outbound_queue_depth.add(amount=1, attributes=self.attributes)
+
+    def overflow(self, entry: tuple) -> None:
+        """
+        Apply the overflow policy to a frame that does not fit into the queue.
+
+        Args:
+            entry (tuple): The payload and the delivery of a frame.
+        """
+        match self.overflow_policy:
+            case OverflowPolicy.DROP_OLDEST:
+                self.release(entry=self.queue.get_nowait())
+                self.queue.task_done()
+                self.queue.put_nowait(entry)
+            case OverflowPolicy.COALESCE:
+                self.coalesce(entry=entry)
+            case OverflowPolicy.CLOSE:
+                self.close()
+                self.release(entry=entry)
+                self.closer = create_task(self.websocket.close(code=settings.outbound_overflow_close_code))
+
+    def coalesce(self, entry: tuple) -> None:
+        """
+        Merge every queued frame and the new one into a single batch.
+
+        No message is dropped: a socket that opted in to coalescing gets the batch as one
+        array frame, any other socket gets its frames one by one. Should the payloads of
+        the batch exceed the maximum size, the socket is closed as with the CLOSE policy.
+
+        Args:
+            entry (tuple): The payload and the delivery of a frame.
+        """
+        batch = []
+
+        while True:
+            try:
+                queued = self.queue.get_nowait()
+            except QueueEmpty:
+                break
+
+            self.queue.task_done()
+
+            if isinstance(queued, list):
+                batch.extend(queued)
+            else:
+                batch.append(queued)
+
+        batch.append(entry)
+
+        self.queue.put_nowait(batch)
+        websocket_outbound_queue_depth.add(amount=1 - self.queue.maxsize, attributes=self.attributes)
+
+        if sum(len(payload) for payload, _ in batch) > self.overflow_max_bytes:
+            self.close()
+            self.closer = create_task(self.websocket.close(code=settings.outbound_overflow_close_code))
+
+    def report_delivered(self, entry: tuple | list) -> None:
+        """
+        Report the messages of a written queue entry that were addressed to the user of the socket.
+
+        Args:
+            entry (tuple | list): A frame or a batch of frames.
+        """
+        for _, delivery in (entry if isinstance(entry, list) else (entry,)):
+            if delivery is not None and delivery.message_id is not None and delivery.recipient_id == self.user_id:
+                self.on_delivered(delivery.message_id)
+
+    def release(self, entry: tuple | list) -> None:
+        """
+        Release the deliveries of a written or dropped queue entry.
+
+        Args:
+            entry (tuple | list): A frame or a batch of frames.
+        """
+        for _, delivery in (entry if isinstance(entry, list) else (entry,)):
+            if delivery is not None:
+                delivery.release()
+
+    async def write(self) -> None:
+        """
+        Write the queued frames to the socket.
+
+        The writer stops once the socket is gone, the disconnect itself is handled by the
+        receiving side of the connection.
+        """
+        try:
+            while True:
+                entry = await self.queue.get()
+                websocket_outbound_queue_depth.add(amount=-1, attributes=self.attributes)
+
+                if self.coalescing_window is not None:
+                    entry = await self.gather_burst(entry=entry)
+
+                await self.write_burst(entry=entry)
+        except (WebSocketDisconnect, RuntimeError):
+            self.close()
+
+    async def write_burst(self, entry: tuple | list) -> None:
+        """
+        Write a queue entry and the frames queued behind it within a single send timeout.
+
+        A frame the client does not take in time is dropped and its delivery released, so
+        a client that stopped reading never holds the ack of its messages to the broker.
+        The burst ends once half of the timeout is used up, so every frame of it still has
+        at least the other half to be taken. A socket that coalesces has a burst per entry,
+        as its entries are gathered first.
+
+        Args:
+            entry (tuple | list): A frame or a batch of frames taken from the queue.
+        """
+        loop = get_running_loop()
+        deadline = loop.time() + settings.outbound_send_timeout
+        refill_until = deadline - settings.outbound_send_timeout / 2
+
+        try:
+            async with timeout_at(deadline):
+                while True:
+                    try:
+                        await self.send(entry=entry)
+
+                        if self.on_delivered is not None:
+                            self.report_delivered(entry=entry)
+                    finally:
+                        self.release(entry=entry)
+
+                    self.queue.task_done()
+
+                    if self.coalescing_window is not None or loop.time() > refill_until:
+                        return
+
+                    try:
+                        entry = self.queue.get_nowait()
+                    except QueueEmpty:
+                        return
+
+                    websocket_outbound_queue_depth.add(amount=-1, attributes=self.attributes)
+        except TimeoutError:
+            websocket_outbound_send_timeouts.add(amount=1, attributes=self.attributes)
+            self.queue.task_done()
+
+    async def send(self, entry: tuple | list) -> None:
+        """
+        Write a queue entry to the socket.
+
+        A batch is written as array frames up to the maximum size of a coalesced frame only
+        to a socket that opted in to coalescing, any other socket gets the frames of the
+        batch one by one.
+
+        Args:
+            entry (tuple | list): A frame or a batch of frames.
+        """
+        if isinstance(entry, list) and self.coalescing_window is None:
+            for frame in entry:
+                await self.send(entry=frame)
+        elif isinstance(entry, list):
+            for frames in self.split(batch=entry):
+                if len(frames) == 1:
+                    await self.send(entry=frames[0])
+                elif self.codec is not None:
+                    await self.websocket.send_bytes(self.codec.join([payload for payload, _ in frames]))
+                else:
+                    await self.websocket.send_text(f'[{",".join(payload for payload, _ in frames)}]')
+        elif self.codec is not None:
+            await self.websocket.send_bytes(entry[0])
+        else:
+            await self.websocket.send_text(entry[0])
+
+    def split(self, batch: list) -> list[list]:
+        """
+        Split a batch into the batches whose payloads fit into the maximum size of a coalesced frame.
+
+        A frame larger than the maximum on its own makes a batch of its own.
+
+        Args:
+            batch (list): A batch of frames.
+
+        Returns:
+            list[list]: The batches in the order of their frames.
+        """
+        batches = [[]]
+        size = 0
+
+        for frame in batch:
+            if batches[-1] and size + len(frame[0]) > self.coalescing_max_bytes:
+                batches.append([])
+                size = 0
+
+            batches[-1].append(frame)
+            size += len(frame[0])
+
+        return batches
+
+    async def gather_burst(self, entry: tuple | list) -> tuple | list:
+        """
+        Coalesce the frames queued within the coalescing window with a frame about to be written.
+
+        The frames are taken until the size of their payloads reaches the maximum, the rest
+        stay queued for the next frame.
+
+        Args:
+            entry (tuple | list): A frame or a batch of frames taken from the queue.
+
+        Returns:
+            tuple | list: The frame itself or a batch of the coalesced frames.
+        """
+        batch = entry if isinstance(entry, list) else [entry]
+        size = sum(len(payload) for payload, _ in batch)
+
+        if size >= self.coalescing_max_bytes:
+            return entry
+
+        try:
+            await sleep(self.coalescing_window)
+        except BaseException:
+            self.release(entry=batch)
+            raise
+
+        while size < self.coalescing_max_bytes:
+            try:
+                queued = self.queue.get_nowait()
+            except QueueEmpty:
+                break
+
+            self.queue.task_done()
+            websocket_outbound_queue_depth.add(amount=-1, attributes=self.attributes)
+
+            queued = queued if isinstance(queued, list) else [queued]
+            batch.extend(queued)
+            size += sum(len(payload) for payload, _ in queued)
+
+        if len(batch) == 1:
+            return batch[0]
+
+        websocket_coalesced_frame_size.record(amount=len(batch))
+        return batch
+
+    async def drain(self, timeout: float, code: int, reason: str) -> None:
+        """
+        Write the queued frames and close the socket.
+
+        Args:
+            timeout (float): The maximum time to wait for the queued frames to be written.
+            code (int): The close code.
+            reason (str): The close reason.
+        """
+        if not self.closed:
+            try:
+                await wait_for(self.queue.join(), timeout=timeout)
+            except TimeoutError:
+                pass
+
+        self.close()
+
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except RuntimeError:
+            pass
+
+    def close(self) -> None:
+        """
+        Stop the writer and discard the frames that were not written.
+        """
+        if self.closed:
+            return
+
+        self.closed = True
+
+        if self.writer is not None:
+            self.writer.cancel()
+
+        if (depth := self.queue.qsize()):
+            websocket_outbound_queue_depth.add(amount=-depth, attributes=self.attributes)
+
+        while True:
+            try:
+                entry = self.queue.get_nowait()
+            except QueueEmpty:
+                break
+
+            self.release(entry=entry)
+            self.queue.task_done()
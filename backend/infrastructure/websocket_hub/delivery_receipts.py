@@ -0,0 +1,86 @@
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+from domain.entities.message import current_timestamp
+from infrastructure.batching import Batcher
+from infrastructure.monitoring import delivery_receipts_batch_size, delivery_receipts_recorded
+
+
+class DeliveryReceipts:
+    """
+    The collector of the receipts of the messages written to the sockets of their recipients.
+
+    The receipts are sent in batches once a batch is full or once the flush interval has
+    passed since its first receipt, so acknowledging the deliveries to the storage service
+    costs a single broker message per batch. A message written to several sockets of the
+    recipient gets a single receipt with the moment of the first write, as long as it is
+    among the most recent receipts the collector remembers.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[list], Awaitable],
+        batch_size: int,
+        flush_interval: float,
+        recent_size: int,
+    ) -> None:
+        """
+        Initialize the collector.
+
+        Args:
+            send (Callable): The coroutine function that sends a batch of [message_id, delivered_at] pairs.
+            batch_size (int): The amount of receipts that flushes a batch right away.
+            flush_interval (float): The maximum time in seconds a receipt waits for its batch to be flushed.
+            recent_size (int): The amount of the ids of the sent receipts remembered to skip their duplicates.
+        """
+        self.send = send
+        self.recent_size = recent_size
+        self.receipts: dict[int, str] = {}
+        self.recent: OrderedDict[int, None] = OrderedDict()
+        self.batcher = Batcher(flush=self.flush, batch_size=batch_size, flush_interval=flush_interval)
+
+    def start(self) -> None:
+        """
+        Start flushing the batches.
+        """
+        self.batcher.start()
+
+    def record(self, message_id: int) -> None:
+        """
+        Record that a message was written to a socket of its recipient.
+
+        Args:
+            message_id (int): The id of the message.
+        """
+        if message_id in self.receipts or message_id in self.recent:
+            return
+
+        self.receipts[message_id] = current_timestamp()
+        delivery_receipts_recorded.add(amount=1)
+        self.batcher.added(size=len(self.receipts))
+
+    async def flush(self) -> None:
+        """
+        Send the receipts of the current batch.
+        """
+        receipts, self.receipts = self.receipts, {}
+        self.batcher.taken()
+
+        if not receipts:
+            return
+
+        self.recent.update(dict.fromkeys(receipts))
+
+        while len(self.recent) > self.recent_size:
+            self.recent.popitem(last=False)
+
+        delivery_receipts_batch_size.record(amount=len(receipts))
+        await self.send(receipts=[[message_id, delivered_at] for message_id, delivered_at in receipts.items()])
+
+    async def close(self) -> None:
+        """
+        Stop flushing periodically and send what is left.
+        """
+        self.batcher.stop()
+
+        await self.flush()
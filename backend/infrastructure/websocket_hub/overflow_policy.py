@@ -0,0 +1,14 @@
+from enum import Enum
+
+
+class OverflowPolicy(str, Enum):
+    """
+    Defines what happens when the outbound queue of a connection is full.
+
+    - DROP_OLDEST: the oldest queued frame is dropped to make room for the new one.
+    - CLOSE: the socket is closed with the configured close code.
+    - COALESCE: the queued frames are merged into a single batch, the socket is closed once it grows too large.
+    """
+    DROP_OLDEST = 'drop_oldest'
+    CLOSE = 'close'
+    COALESCE = 'coalesce'
@@ -6,79 +6,361 @@
 
 
 
-from json import JSONDecodeError
+from asyncio import gather
+from collections.abc import Awaitable, Callable
+from random import uniform
 from uuid import uuid4
 
-from fastapi import WebSocket
+from fastapi import WebSocket, WebSocketDisconnect, WebSocketException
+from fastapi.websockets import WebSocketState
+
+from settings import settings
 
 from application.ports import WebSocketHubPort
+from infrastructure.codecs import Codec
 from infrastructure.monitoring import websocket_hub_active_connections
+from infrastructure.transport import Delivery
+from infrastructure.websocket_hub.connection import Connection
+from infrastructure.websocket_hub.delivery_receipts import DeliveryReceipts
+from infrastructure.websocket_hub.overflow_policy import OverflowPolicy
 
 
 class WebSocketHub(WebSocketHubPort):
     """
     The hub that is responsible for the orchestrating the websockets workflow.
+
+    Every socket is wrapped into a Connection with its own outbound queue and writer
+    task, so sending to the users never waits for the sockets themselves.
+
+    A client may negotiate a binary subprotocol upon connecting. The frames of such a
+    socket are decoded and encoded with the codec of the subprotocol, the rest of the
+    sockets speak text JSON.
+
+    A client may also opt in to coalescing by listing it in the capabilities query
+    parameter, e.g. ``?capabilities=coalesce``. A burst of messages for such a socket is
+    written as array frames instead of a frame per message.
+
+    On shutdown the hub is drained: new sockets are rejected and every open socket is
+    closed once its queue is written, with a randomized reconnect delay in the close
+    reason so that the clients do not reconnect all at the same moment.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, codec: Codec, delivery_receipts: DeliveryReceipts, subprotocol_codecs: dict[str, Codec]) -> None:
         """
         Initializes the hub.
+
+        Args:
+            codec (Codec): The codec the text frames are encoded with.
+            delivery_receipts (DeliveryReceipts): The collector of the receipts of delivered messages.
+            subprotocol_codecs (dict): The codecs of the binary subprotocols by subprotocol name.
         """
-        self.connections = {}
+        self.codec = codec
+        self.delivery_receipts = delivery_receipts
+        self.subprotocol_codecs = {
+            subprotocol: subprotocol_codec
+            for subprotocol, subprotocol_codec in subprotocol_codecs.items()
+            if subprotocol in settings.websocket_subprotocols
+        }
+        self.connections: dict[int, dict[str, Connection]] = {}
+        self.overflow_policy = OverflowPolicy(settings.outbound_overflow_policy)
+        self.draining = False
 
     async def connect_user(self, user_id: int, websocket: WebSocket) -> None:
         """
         Connect a user to the hub.
 
-        Accept the websocket connection.
+        Negotiate the subprotocol and accept the websocket connection.
+        Start the writer of the connection.
         Store the connection mapping.
 
         Args:
             user_id (int): An id of a user that is trying to connect to the websocket endpoint.
             websocket (WebSocket): An instance of FastAPI WebSocket.
+
+        Raises:
+            WebSocketException: Raisen if the hub is draining.
         """
+        if self.draining:
+            raise WebSocketException(code=settings.drain_close_code, reason=self.reconnect_hint())
+
         websocket_id = uuid4().hex
-        websocket.scope.update({'websocket_id': websocket_id})
+        subprotocol, subprotocol_codec = self.negotiate(websocket=websocket)
+        websocket.scope.update({'websocket_id': websocket_id, 'subprotocol_codec': subprotocol_codec})
 
-        await websocket.accept()
+        await websocket.accept(subprotocol=subprotocol)
 
-        connections = self.connections.setdefault(user_id, set())
-        connections.add(websocket)
+        connection = Connection(
+            user_id=user_id,
+            websocket=websocket,
+            queue_size=settings.outbound_queue_size,
+            overflow_policy=self.overflow_policy,
+            on_delivered=self.delivery_receipts.record if settings.delivery_receipts else None,
+            codec=subprotocol_codec,
+            coalescing_window=settings.outbound_coalescing_window if self.coalesces(websocket=websocket) else None,
+            coalescing_max_bytes=settings.outbound_coalescing_max_bytes,
+            overflow_max_bytes=settings.outbound_overflow_max_bytes,
+        )
+        connection.start()
+
+        self.connections.setdefault(user_id, {})[websocket_id] = connection
 
         websocket_hub_active_connections.add(amount=1)
 
-    async def receive(self, websocket: WebSocket) -> dict | None:
+    def negotiate(self, websocket: WebSocket) -> tuple[str | None, Codec | None]:
+        """
+        Pick the first subprotocol offered by the client that the hub speaks.
+
+        Args:
+            websocket (WebSocket): An instance of FastAPI WebSocket.
+
+        Returns:
+            tuple: The subprotocol to accept and its codec, None for text JSON.
+        """
+        for subprotocol in websocket.scope.get('subprotocols', ()):
+            if subprotocol == settings.websocket_json_subprotocol:
+                return subprotocol, None
+            if (subprotocol_codec := self.subprotocol_codecs.get(subprotocol)) is not None:
+                return subprotocol, subprotocol_codec
+
+        return None, None
+
+    def coalesces(self, websocket: WebSocket) -> bool:
+        """
+        Check whether the outbound frames of a socket should be coalesced.
+
+        Args:
+            websocket (WebSocket): An instance of FastAPI WebSocket.
+
+        Returns:
+            bool: Whether coalescing is enabled and the client opted in to it.
+        """
+        if not settings.outbound_coalescing:
+            return False
+
+        capabilities = websocket.query_params.get('capabilities', '').split(',')
+        return settings.outbound_coalescing_capability in capabilities
+
+    def subprotocol_codec(self, websocket: WebSocket) -> Codec | None:
+        """
+        Get the codec of the binary subprotocol negotiated by a socket.
+
+        Args:
+            websocket (WebSocket): An instance of FastAPI WebSocket.
+
+        Returns:
+            Codec | None: The codec or None if the socket speaks text JSON.
+        """
+        return websocket.scope.get('subprotocol_codec')
+
+    async def send_frame(self, websocket: WebSocket, message_data: dict) -> None:
+        """
+        Write a frame to a socket right away in the format the socket speaks.
+
+        Args:
+            websocket (WebSocket): An instance of FastAPI WebSocket.
+            message_data (dict): The frame in the form of a dictionary.
+        """
+        if (subprotocol_codec := self.subprotocol_codec(websocket=websocket)) is not None:
+            await websocket.send_bytes(subprotocol_codec.encode(message_data))
+        else:
+            await websocket.send_json(message_data)
+
+    async def receive(
+        self,
+        websocket: WebSocket,
+        on_error: Callable[..., Awaitable] | None = None,
+    ) -> dict | None:
         """
         Receive a single message from the websocket channel and check whether a valid JSON was sent.
 
+        The frame is decoded with the codec of the negotiated subprotocol or with the codec
+        of the hub, both text and binary frames are accepted then.
+
         Args:
             websocket (WebSocket): An instance of FastAPI WebSocket.
+            on_error (Callable | None): Answers an invalid frame with the error given to it,
+                the error is written to the socket right away without it.
 
         Returns:
             dict: A message data in the form of a dictionary if the data is valid.
+
+        Raises:
+            WebSocketDisconnect: Raisen if the socket was disconnected.
         """
+        codec = self.subprotocol_codec(websocket=websocket) or self.codec
+
         try:
-            return await websocket.receive_json()
-        except (JSONDecodeError, RuntimeError):
-            await websocket.send_json({'title': 'Data integrity error.', 'details': 'Invalid JSON was provided.'})
+            return codec.decode(await self.receive_frame(websocket=websocket))
+        except ValueError:
+            error = {'title': 'Data integrity error.', 'details': 'Invalid JSON was provided.'}
+
+            if on_error is not None:
+                await on_error(error=error)
+            else:
+                await self.send_frame(websocket=websocket, message_data=error)
+
+    async def receive_frame(self, websocket: WebSocket) -> str | bytes:
+        """
+        Receive the raw data of a single frame from the websocket channel.
+
+        Args:
+            websocket (WebSocket): An instance of FastAPI WebSocket.
+
+        Returns:
+            str | bytes: The text of a text frame or the bytes of a binary frame.
+
+        Raises:
+            WebSocketDisconnect: Raisen if the socket was disconnected.
+        """
+        if websocket.application_state != WebSocketState.CONNECTED:
+            raise WebSocketDisconnect(code=settings.outbound_overflow_close_code)
+
+        message = await websocket.receive()
+
+        if message['type'] == 'websocket.disconnect':
+            raise WebSocketDisconnect(code=message.get('code', 1000), reason=message.get('reason'))
+
+        if (text := message.get('text')) is not None:
+            return text
+        return message.get('bytes') or b''
+
+    def encode(self, message_data: dict) -> str:
+        """
+        Serialize a message into the payload of a text frame.
+
+        Text frames carry str under ASGI, so the bytes of the codec are decoded once per
+        message and the result is shared by every socket.
+
+        Args:
+            message_data (dict): A message in the form of a dictionary.
+
+        Returns:
+            str: The JSON encoded message.
+        """
+        return self.codec.encode(message_data).decode('utf-8')
 
     async def send(self, message_data: dict, user_ids: set) -> None:
         """
-        Send a message to a user if such is connected to the hub.
+        Send a message to the users if such are connected to the hub.
+
+        The message is encoded once and the same payload is written to every socket.
 
         Args:
             message_data (dict): A message in the form of a dictionary.
+            user_ids (set): The ids of the users that should receive the message.
+        """
+        await self.broadcast(payload=self.encode(message_data=message_data), user_ids=user_ids)
+
+    async def broadcast(self, payload: str, user_ids: set, delivery: Delivery | None = None) -> None:
+        """
+        Queue an already encoded payload for every socket of the users.
+
+        Args:
+            payload (str): An encoded message.
+            user_ids (set): The ids of the users that should receive the message.
+            delivery (Delivery | None): The delivery the payload belongs to, it is held until written.
         """
-        print(f'GOT USER IDS {user_ids}')
         for user_id in user_ids:
-            if (websockets := self.connections.get(user_id)) is not None:
-                print(f'CONNECTED WEBSOCKETS ARE {websockets}')
-                for websocket in websockets:
-                    await websocket.send_json(message_data)
+            if (connections := self.connections.get(user_id)) is not None:
+                for connection in connections.values():
+                    if connection.codec is None:
+                        connection.put(payload=payload, delivery=delivery)
+                    else:
+                        connection.put(
+                            payload=self.transcode(codec=connection.codec, payload=payload, delivery=delivery),
+                            delivery=delivery,
+                        )
+
+    def transcode(self, codec: Codec, payload: str, delivery: Delivery | None) -> bytes:
+        """
+        Encode a message for a binary subprotocol.
+
+        The encoding is cached on the delivery, so a message is encoded once per codec
+        however many sockets speak it.
+
+        Args:
+            codec (Codec): The codec of the subprotocol.
+            payload (str): The message encoded as JSON.
+            delivery (Delivery | None): The delivery the payload belongs to.
+
+        Returns:
+            bytes: The encoded message.
+        """
+        if delivery is None:
+            return codec.encode(self.codec.decode(payload))
+
+        if delivery.encodings is None:
+            delivery.encodings = {}
+
+        if (encoding := delivery.encodings.get(codec.name)) is None:
+            if delivery.message_data is None:
+                delivery.message_data = self.codec.decode(payload)
+
+            encoding = delivery.encodings[codec.name] = codec.encode(delivery.message_data)
+
+        return encoding
+
+    def reply(self, user_id: int, websocket: WebSocket, message_data: dict) -> None:
+        """
+        Queue a frame for a single socket of a user.
+
+        The frame goes through the outbound queue of the socket, so it is written in order
+        with the messages delivered to the socket.
+
+        Args:
+            user_id (int): The id of the user the socket belongs to.
+            websocket (WebSocket): An instance of FastAPI WebSocket.
+            message_data (dict): The frame in the form of a dictionary.
+        """
+        if (connection := self.connections.get(user_id, {}).get(websocket.scope.get('websocket_id'))) is not None:
+            if connection.codec is None:
+                connection.put(payload=self.encode(message_data=message_data))
+            else:
+                connection.put(payload=connection.codec.encode(message_data))
+
+    def connected_user_ids(self) -> list[int]:
+        """
+        List the users with at least one socket connected to the hub.
+
+        Returns:
+            list[int]: The ids of the connected users.
+        """
+        return list(self.connections)
+
+    def reconnect_hint(self) -> str:
+        """
+        Build a close reason that tells a client when to reconnect.
+
+        Returns:
+            str: The encoded hint with a delay spread over the reconnect window.
+        """
+        return self.encode(message_data={'reconnect_after': round(uniform(0, settings.drain_reconnect_window), 3)})
+
+    def stop_accepting(self) -> None:
+        """
+        Reject the sockets that try to connect from now on.
+        """
+        self.draining = True
+
+    async def drain(self) -> None:
+        """
+        Write the queued frames of every socket and close the sockets with reconnect hints.
+        """
+        self.stop_accepting()
+
+        await gather(*(
+            connection.drain(
+                timeout=settings.drain_flush_timeout,
+                code=settings.drain_close_code,
+                reason=self.reconnect_hint(),
+            )
+            for connections in self.connections.values()
+            for connection in connections.values()
+        ))
 
     async def disconnect_user(self, user_id: int, websocket: WebSocket) -> None:
         """
-        Close the websocket connection and remove the mapping from the storage.
+        Stop the writer of the connection and remove the mapping from the storage.
 
         Args:
             user_id (int): An id of a user that has disconnected from the websocket endpoint.
@@ -86,14 +368,12 @@ class WebSocketHub(WebSocketHubPort):
         """
         websocket_id = websocket.scope.get('websocket_id')
 
-        if (websockets := self.connections.get(user_id)) is not None:
-
-            websocket = next(iter(ws for ws in websockets if ws.scope.get('websocket_id') == websocket_id), None)
+        if (connections := self.connections.get(user_id)) is not None:
 
-            if websocket is not None:
-                websockets.remove(websocket)
+            if (connection := connections.pop(websocket_id, None)) is not None:
+                connection.close()
 
-                if not websockets:
+                if not connections:
                     self.connections.pop(user_id)
 
                 websocket_hub_active_connections.add(amount=-1)
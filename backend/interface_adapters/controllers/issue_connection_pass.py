@@ -1,4 +1,4 @@
-from application.ports import ConnectionPassManagerPort, RedisManagerPort
+from application.ports import ConnectionPassManagerPort
 from application.use_cases import IssueConnectionPassUseCase
 from interface_adapters.outgoing_dtos import OutgoingConnectionPassDTO
 
@@ -15,7 +15,6 @@ class IssueConnectionPassController:
         self,
         user_id: int,
         connection_pass_manager: ConnectionPassManagerPort,
-        redis_manager: RedisManagerPort,
     ) -> None:
         """
         Initialize class.
@@ -24,11 +23,9 @@ class IssueConnectionPassController:
 
             user_id (int): The id of the user that requested a connection pass.
             connection_pass_manager (ConnectionPassManager): The port for the connection pass manager.
-            redis_manager (RedisManager): The port for the redis manager class.
         """
         self.user_id = user_id
         self.connection_pass_manager = connection_pass_manager
-        self.redis_manager = redis_manager
 
     async def issue_connection_pass(self) -> OutgoingConnectionPassDTO:
         """
@@ -41,7 +38,6 @@ class IssueConnectionPassController:
         use_case = IssueConnectionPassUseCase(
             user_id=self.user_id,
             connection_pass_manager=self.connection_pass_manager,
-            redis_manager=self.redis_manager,
         )
 
         connection_pass = await use_case.execute()
@@ -1,3 +1,5 @@
+from asyncio import Future
+
 from application.ports import RabbitMQManagerPort
 from application.use_cases import SendMessageUseCase
 
@@ -28,10 +30,13 @@ class SendMessageController:
         self.incoming_message = incoming_message
         self.rabbitmq_manager = rabbitmq_manager
 
-    async def send_message(self) -> None:
+    async def send_message(self) -> Future:
         """
         Get the prepared message data and call the use case
         in order to send a message to the broker.
+
+        Returns:
+            Future: The future that is resolved once the broker has accepted the message.
         """
         clean_message_data = await self.prepare_message_data()
 
@@ -40,7 +45,7 @@ class SendMessageController:
             rabbitmq_manager=self.rabbitmq_manager,
         )
 
-        await use_case.execute()
+        return await use_case.execute()
 
     async def prepare_message_data(self) -> dict:
         """
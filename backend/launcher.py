@@ -0,0 +1,66 @@
+"""
+The entry point that runs the application on every core of the box.
+
+The supervisor binds the listening socket once and starts the configured amount of
+uvicorn workers that share it. Every worker runs its own lifespan, so it generates its
+own process id, declares its own RabbitMQ queue and keeps its own Redis mappings.
+
+The websockets negotiate permessage-deflate with the compression settings.
+
+Signed connection passes are refused with several workers, their replay filter is kept
+in the memory of a worker, so a pass could be redeemed once by every worker. So is the
+loopback broker, it only dispatches the messages to the users of the same worker.
+
+On SIGTERM the supervisor forwards the signal to every worker. A worker stops accepting
+connections, drains the hub and waits up to the drain timeout for the running tasks
+before its lifespan shuts down.
+
+Run with ``python launcher.py``.
+"""
+from uvicorn import Config
+from uvicorn.supervisors import Multiprocess
+
+from settings import settings
+
+from infrastructure.server import CompressingWebSocketProtocol, DrainingServer
+
+
+def launch() -> None:
+    """
+    Start the workers.
+
+    Raises:
+        SystemExit: Raisen if signed connection passes or the loopback broker are used with several workers.
+    """
+    if settings.connection_pass_mode == 'signed' and settings.launcher_workers_count > 1:
+        raise SystemExit(
+            'Signed connection passes can be replayed across workers, '
+            'set CONNECTION_PASS_MODE=redis or LAUNCHER_WORKERS_COUNT=1.'
+        )
+
+    if settings.broker == 'loopback' and settings.launcher_workers_count > 1:
+        raise SystemExit(
+            'The loopback broker only reaches the users of the same worker, '
+            'set BROKER=rabbitmq or LAUNCHER_WORKERS_COUNT=1.'
+        )
+
+    config = Config(
+        'main:application',
+        host=settings.launcher_host,
+        port=settings.launcher_port,
+        workers=settings.launcher_workers_count,
+        loop=settings.launcher_event_loop,
+        ws=CompressingWebSocketProtocol,
+        ws_per_message_deflate=settings.websocket_compression,
+        timeout_graceful_shutdown=settings.launcher_drain_timeout,
+    )
+    server = DrainingServer(config=config)
+
+    if config.workers > 1:
+        Multiprocess(config=config, target=server.run, sockets=[config.bind_socket()]).run()
+    else:
+        server.run()
+
+
+if __name__ == '__main__':
+    launch()
@@ -1,10 +1,13 @@
-from asyncio import CancelledError, create_task
+from asyncio import create_task, wait_for
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from settings import settings
+
 from infrastructure.dependency_injector import DependenciesContainer
 from infrastructure.tasks import consume_and_send_to_user
+from infrastructure.transport import message_queue
 from infrastructure.utils import generate_process_id
 
 
@@ -23,18 +26,53 @@ async def lifespan(application: FastAPI):
     )
 
     rabbitmq_manager = dependecies_container.rabbitmq_manager()
+    redis_manager = dependecies_container.redis_manager()
+    websocket_hub = dependecies_container.websocket_hub()
+    delivery_receipts = dependecies_container.delivery_receipts()
 
     await rabbitmq_manager.start()
+    delivery_receipts.start()
+
+    heartbeat_task = create_task(redis_manager.heartbeat(connected_user_ids=websocket_hub.connected_user_ids))
+    sweeping_task = create_task(redis_manager.sweep())
 
     rabbitmq_consumption_task = create_task(rabbitmq_manager.consume())
-    queue_consumption_task = create_task(consume_and_send_to_user())
+    queue_consumption_tasks = [
+        create_task(consume_and_send_to_user(shard_index=shard_index))
+        for shard_index in range(settings.dispatch_workers_count)
+    ]
+
+    async def drain() -> None:
+        """
+        Stop accepting sockets and consuming from RabbitMQ, dispatch the queued deliveries
+        and close the sockets with reconnect hints.
+        """
+        if websocket_hub.draining:
+            return
+
+        websocket_hub.stop_accepting()
+        rabbitmq_consumption_task.cancel()
+
+        try:
+            await wait_for(message_queue.join(), timeout=settings.drain_flush_timeout)
+        except TimeoutError:
+            pass
+
+        await websocket_hub.drain()
+
+    application.state.drain = drain
 
     try:
         yield
     finally:
-        try:
-            rabbitmq_consumption_task.cancel()
-        except CancelledError:
-            pass
+        await drain()
+
+        for queue_consumption_task in queue_consumption_tasks:
+            queue_consumption_task.cancel()
+
+        heartbeat_task.cancel()
+        sweeping_task.cancel()
 
+        await delivery_receipts.close()
         await dependecies_container.rabbitmq_manager().close()
+        await redis_manager.close()
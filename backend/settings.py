@@ -1,3 +1,5 @@
+from os import cpu_count
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -11,14 +13,86 @@ class Settings(BaseSettings):
     algorithm: str = Field(validation_alias='ALGORITHM')
     connection_pass_length: str = Field(validation_alias='CONNECTION_PASS_LENGTH')
     connection_pass_expiration_time: str = Field(validation_alias='CONNECTION_PASS_EXPIRATION_TIME')
+    connection_pass_mode: str = 'redis'
+    jwt_cache_size: int = 4096
     #REDIS
     redis_url: str = Field(validation_alias='REDIS_URL')
     connected_users_name: str = 'connected_users'
+    redis_batching: bool = True
+    redis_batch_size: int = 256
+    redis_flush_interval: float = 0.002
+    process_heartbeat_interval: float = 5
+    process_heartbeat_ttl: int = 15
+    dead_processes_sweep_interval: float = 30
     #RABBITMQ
     rabbitmq_url: str = Field(validation_alias='RABBITMQ_URL')
     websockets_exchange_name: str = Field(validation_alias='WEBSOCKETS_EXCHANGE_NAME')
     database_exchange_name: str = Field(validation_alias='DATABASE_EXCHANGE_NAME')
-    channel_prefetch_messages_count: int = 16
+    channel_prefetch_messages_count: int = 1024
+    publish_batch_size: int = 64
+    publish_flush_interval: float = 0.002
+    publish_max_in_flight: int = 1024
+    ack_batch_size: int = 256
+    ack_flush_interval: float = 0.05
+    rabbitmq_passthrough: bool = True
+    rabbitmq_passthrough_scan: bool = True
+    #LOOPBACK
+    broker: str = 'rabbitmq'
+    loopback_persistence: str = 'file'
+    loopback_persistence_path: str = 'messages.jsonl'
+    loopback_persistence_callback: str | None = None
+    loopback_persistence_batch_size: int = 256
+    loopback_persistence_flush_interval: float = 0.05
+    loopback_dispatch_retry_interval: float = 0.001
+    #DISPATCH
+    dispatch_workers_count: int = 4
+    dispatch_shard_queue_size: int = 1024
+    dispatch_shard_high_watermark: int = 768
+    dispatch_shard_low_watermark: int = 256
+    #WEBSOCKETS
+    websocket_subprotocols: list = ['msgpack', 'cbor']
+    websocket_json_subprotocol: str = 'json'
+    inbound_fast_path: bool = True
+    inbound_acks: bool = False
+    inbound_ack_window: int = 32
+    outbound_queue_size: int = 64
+    outbound_overflow_policy: str = 'drop_oldest'
+    outbound_overflow_close_code: int = 4408
+    outbound_overflow_max_bytes: int = 1048576
+    outbound_send_timeout: float = 5
+    outbound_coalescing: bool = True
+    outbound_coalescing_capability: str = 'coalesce'
+    outbound_coalescing_window: float = 0.005
+    outbound_coalescing_max_bytes: int = 65536
+    drain_close_code: int = 1012
+    drain_reconnect_window: float = 10
+    drain_flush_timeout: float = 5
+    rate_limiting: bool = True
+    connection_rate_limit: float = 20
+    connection_rate_burst: float = 40
+    user_rate_limit: float = 40
+    user_rate_burst: float = 80
+    rate_limit_strikes: float = 20
+    rate_limit_strikes_refill: float = 0.5
+    rate_limit_close_code: int = 4429
+    websocket_compression: bool = True
+    websocket_compression_window_bits: int = 12
+    websocket_compression_memory_level: int = 5
+    websocket_compression_min_size: int = 256
+    websocket_compression_context_takeover: bool = True
+    delivery_receipts: bool = False
+    delivery_receipts_batch_size: int = 256
+    delivery_receipts_flush_interval: float = 0.5
+    delivery_receipts_recent_size: int = 65536
+    #SERIALIZATION
+    json_codec: str = 'orjson'
+    omit_default_message_fields: bool = False
+    #LAUNCHER
+    launcher_host: str = '0.0.0.0'
+    launcher_port: int = 8001
+    launcher_workers_count: int = Field(default_factory=lambda: cpu_count() or 1)
+    launcher_event_loop: str = 'auto'
+    launcher_drain_timeout: float = 30
     #CORS
     cors_origins: list = ['http://localhost:3000']
     #METRICS